@@ -1,14 +1,124 @@
-"""Entry point for running as module: python -m app"""
+"""Entry point for running as module: python -m app [serve|worker|export|rebalance]"""
 
-import uvicorn
+import argparse
+import asyncio
+import os
+import sys
 
 from app.config import settings
 
 
-if __name__ == "__main__":
+async def run_export(fmt: str, output: str | None, compress: bool, chunk_size: int | None) -> None:
+    """Stream books export to file (or stdout, partial file is removed on failure)."""
+
+    from app.common.export import FORMAT_REQUIREMENTS, is_format_available
+    from app.core.database import init_database, get_session_factory
+    from app.core.hooks import registry
+    from app.core.updates_engine import initialize_updates
+
+    if not is_format_available(fmt):
+        raise SystemExit(f"{fmt} export requires {FORMAT_REQUIREMENTS[fmt]}, install it with: pip install -r requirements-parquet.txt")
+
+    init_database()
+    session_factory = get_session_factory()
+    initialize_updates(session_factory)
+
+    export_books = registry.get_service("export_books")
+
+    # Written to temporary file renamed on success, so failed export leaves no partial output
+    partial = f"{output}.part" if output else None
+    out = open(partial, "wb") if partial else sys.stdout.buffer
+    try:
+        async with session_factory() as session:
+            async for data in export_books(session, fmt, compress, chunk_size):
+                out.write(data)
+    except BaseException:
+        if partial:
+            out.close()
+            os.remove(partial)
+        raise
+
+    if partial:
+        out.close()
+        os.replace(partial, output)
+
+
+async def run_rebalance(model_name: str, chunk_size: int, dry_run: bool) -> None:
+    """Move rows between shards (and from default database into shards) to match their IDs."""
+
+    from app.core.database import init_database, get_session_factory, get_shard_router
+    from app.core.hooks import registry
+    from app.core.updates_engine import initialize_updates
+
+    init_database()
+    initialize_updates(get_session_factory())
+
+    shard_router = get_shard_router()
+    if shard_router is None:
+        raise SystemExit("Sharding is not enabled (DATABASE_SHARDS is empty)")
+
+    model = registry.get_model(model_name)
+    if model is None:
+        raise SystemExit(f"Unknown model: {model_name}")
+
+    moved = await shard_router.rebalance(
+        model,
+        chunk_size=chunk_size,
+        dry_run=dry_run,
+        default_session_factory=get_session_factory(),
+    )
+    for shard, count in moved.items():
+        print(f"{shard}: {count} rows {'to move' if dry_run else 'moved'}")
+
+    await shard_router.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("serve", help="Run web server (default)")
+    subparsers.add_parser("worker", help="Run background jobs worker")
+
+    export_parser = subparsers.add_parser("export", help="Export all books")
+    export_parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], default="csv")
+    export_parser.add_argument("--output", "-o", help="Output file (stdout if omitted)")
+    export_parser.add_argument("--gzip", action="store_true", help="Compress output with gzip")
+    export_parser.add_argument("--chunk-size", type=int, default=None, help="Rows per chunk")
+
+    rebalance_parser = subparsers.add_parser("rebalance", help="Move rows into shards matching their IDs after sharding is enabled or shards change")
+    rebalance_parser.add_argument("--model", default="BookModel", help="Registered model name")
+    rebalance_parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per chunk")
+    rebalance_parser.add_argument("--dry-run", action="store_true", help="Only count rows to move")
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        from app.core.jobs import run_worker
+
+        asyncio.run(run_worker())
+        return
+
+    if args.command == "export":
+        asyncio.run(run_export(args.format, args.output, args.gzip, args.chunk_size))
+        return
+
+    if args.command == "rebalance":
+        asyncio.run(run_rebalance(args.model, args.chunk_size, args.dry_run))
+        return
+
+    # Imported here: offload pool workers re-import this module on start
+    import uvicorn
+
     uvicorn.run(
         app="app.core:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.auto_reload
+        reload=settings.auto_reload,
+        # Uvicorn loggers propagate to queued root handler configured by app
+        log_config=None,
     )
+
+
+if __name__ == "__main__":
+    main()
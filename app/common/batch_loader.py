@@ -0,0 +1,151 @@
+"""
+Micro-batching of calls from concurrent callers.
+
+Collects items submitted by concurrent callers during a short window
+(or until max batch size is reached) and resolves them with one batch call.
+MicroBatcher is the shared base; BatchLoader builds by-key lookups on it
+(Redis PipelineBatcher builds command pipelines on it).
+"""
+
+import asyncio
+
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, TypeVar
+
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class MicroBatcher(ABC, Generic[T]):
+    """
+    Collects submitted items into batches resolved by _run_batch.
+
+    Subclasses implement _run_batch, returning results in order of items
+    (exception instance as result fails only caller of that item).
+    Failed or cancelled batch call fails or cancels all its callers.
+
+    Args:
+        max_batch_size: Max items per batch call
+        window_ms: Time window in milliseconds to collect items before dispatching
+    """
+
+    def __init__(self, max_batch_size: int = 100, window_ms: float = 2.0):
+        self._max_batch_size = max_batch_size
+        self._window = window_ms / 1000
+
+        self._pending: Dict[Hashable, tuple[T, asyncio.Future]] = {}
+        self._handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item: T, key: Hashable | None = None) -> asyncio.Future:
+        """
+        Add item to next batch and get future of its result.
+
+        Items submitted with the same key while batch is collected share one future.
+        """
+
+        if key is not None and key in self._pending:
+            return self._pending[key][1]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key if key is not None else object()] = (item, future)
+
+        if len(self._pending) >= self._max_batch_size:
+            self._dispatch()
+        elif self._handle is None:
+            self._handle = loop.call_later(self._window, self._dispatch)
+
+        return future
+
+    @abstractmethod
+    async def _run_batch(self, items: list[T]) -> list[Any]:
+        """Resolve batch of items, returning results in the same order."""
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        batch, self._pending = list(self._pending.values()), {}
+
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+
+        try:
+            results = await self._run_batch([item for item, _ in batch])
+        except asyncio.CancelledError:
+            # Waiting callers must not hang when batch task is cancelled (e.g. on shutdown)
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class BatchLoader(MicroBatcher[K], Generic[K, V]):
+    """
+    Coalesces concurrent lookups into batched calls.
+
+    Args:
+        batch_fn: Async function receiving list of keys and returning dict key -> value.
+            Missing keys resolve to None.
+        max_batch_size: Max keys per batch call
+        window_ms: Time window in milliseconds to collect keys before dispatching
+    """
+
+    def __init__(
+            self,
+            batch_fn: Callable[[list[K]], Awaitable[Dict[K, V]]],
+            max_batch_size: int = 100,
+            window_ms: float = 2.0,
+    ):
+        super().__init__(max_batch_size, window_ms)
+        self._batch_fn = batch_fn
+
+    async def load(self, key: K) -> V | None:
+        """Load single value by key."""
+
+        # Shield shared future: cancelled caller must not cancel other callers with same key
+        return await asyncio.shield(self.submit(key, key=key))
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        """Load values for multiple keys, preserving order."""
+
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get loader counters."""
+
+        return {
+            "batches": self.batches,
+            "keys_loaded": self.items,
+            "pending": len(self._pending),
+        }
+
+    async def _run_batch(self, keys: list[K]) -> list[V | None]:
+        results = await self._batch_fn(keys)
+
+        return [results.get(key) for key in keys]
@@ -2,7 +2,18 @@
 Common dependencies for FastAPI routes.
 """
 
+from typing import Annotated
+from fastapi import Header, HTTPException
+
 from app.core.database import SessionDep
+from app.common.security import is_admin_token_valid
+
+
+async def require_admin_token(x_admin_token: Annotated[str | None, Header()] = None) -> None:
+    """Reject request without valid X-Admin-Token header."""
+
+    if not is_admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
 
 
-__all__ = ["SessionDep"]
+__all__ = ["SessionDep", "require_admin_token"]
@@ -0,0 +1,163 @@
+"""
+Incremental encoders for streaming exports.
+
+Each encoder consumes async iterator of row chunks (lists of tuples)
+and yields encoded bytes chunk by chunk, so memory stays constant
+regardless of export size.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+from importlib.util import find_spec
+from typing import AsyncIterator, Sequence
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Formats needing optional packages (requirements-parquet.txt)
+FORMAT_REQUIREMENTS = {
+    "parquet": "pyarrow",
+}
+
+Rows = list[tuple]
+
+
+def is_format_available(fmt: str) -> bool:
+    """Check whether optional package required by export format is installed."""
+
+    package = FORMAT_REQUIREMENTS.get(fmt)
+    return package is None or find_spec(package) is not None
+
+
+async def encode_csv(chunks: AsyncIterator[Rows], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encode rows as CSV with header."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+
+    async for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(chunks: AsyncIterator[Rows], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encode rows as newline-delimited JSON objects."""
+
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=str) + "\n"
+            for row in rows
+        ).encode()
+
+
+class _ChunkSink:
+    """Write-only file object collecting bytes between reads, with monotonic position."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+async def encode_parquet(chunks: AsyncIterator[Rows], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encode rows as Parquet, one row group per chunk (requires pyarrow)."""
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow to be installed")
+
+    sink = _ChunkSink()
+    writer = None
+
+    async for rows in chunks:
+        table = pa.table({name: list(values) for name, values in zip(columns, zip(*rows))}) if rows else None
+        if table is None:
+            continue
+
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+
+        writer.write_table(table)
+        yield sink.take()
+
+    if writer is None:
+        empty = pa.table({name: pa.array([], pa.null()) for name in columns})
+        writer = pq.ParquetWriter(sink, empty.schema)
+
+    writer.close()
+    yield sink.take()
+
+
+ENCODERS = {
+    "csv": encode_csv,
+    "ndjson": encode_ndjson,
+    "parquet": encode_parquet,
+}
+
+
+def encode_rows(chunks: AsyncIterator[Rows], columns: Sequence[str], fmt: str) -> AsyncIterator[bytes]:
+    """
+    Encode row chunks into given format.
+
+    Args:
+        chunks: Async iterator of row chunks
+        columns: Column names
+        fmt: Export format (csv, ndjson, parquet)
+    """
+
+    if fmt not in ENCODERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    return ENCODERS[fmt](chunks, columns)
+
+
+async def gzip_stream(stream: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress byte stream incrementally into gzip format."""
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    async for data in stream:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
@@ -0,0 +1,226 @@
+"""
+Per-request profiling: named spans, sampled stack capture and slow-request logging.
+
+Profiling is enabled for a request by X-Profile header together with valid
+X-Admin-Token, or randomly for profiling_sample_rate of requests. Sampled
+stacks are stored in profiling_dir as collapsed stacks (flamegraph.pl,
+speedscope import) or speedscope JSON.
+
+Spans are recorded with profiling_span() context manager. Updates can
+wrap their services into spans with register_profiling_spans hook.
+
+Example:
+    with profiling_span("render.books"):
+        response = templates.TemplateResponse(...)
+"""
+
+import asyncio
+import json
+import logging
+import random
+import re
+import sys
+import threading
+
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from time import perf_counter, strftime
+from typing import Any, Callable, Dict
+
+from app.config import settings
+from app.common.security import is_admin_token_valid
+
+
+logger = logging.getLogger(__name__)
+
+_current_profile: ContextVar["RequestProfile | None"] = ContextVar("current_profile", default=None)
+_null_span = nullcontext()
+
+
+class RequestProfile:
+    """Spans and stack samples collected for one request."""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.spans: Dict[str, list[float]] = {}
+        self.samples: Counter[tuple[str, ...]] = Counter()
+
+    def add_span(self, name: str, duration: float) -> None:
+        self.spans.setdefault(name, []).append(duration)
+
+    def span_summary(self) -> str:
+        return ", ".join(
+            f"{name}={sum(durations) * 1000:.1f}ms" + (f" x{len(durations)}" if len(durations) > 1 else "")
+            for name, durations in sorted(self.spans.items(), key=lambda item: -sum(item[1]))
+        )
+
+
+class _Span:
+    __slots__ = ("_profile", "_name", "_start")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self._profile = profile
+        self._name = name
+
+    def __enter__(self):
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profile.add_span(self._name, perf_counter() - self._start)
+
+
+def profiling_span(name: str):
+    """Context manager recording named span for current request (no-op when not profiled)."""
+
+    profile = _current_profile.get()
+    if profile is None:
+        return _null_span
+
+    return _Span(profile, name)
+
+
+def profiled(name: str, func: Callable) -> Callable:
+    """Wrap async function so each call is recorded as named span."""
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with profiling_span(name):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples stack of given thread at fixed interval.
+
+    Event loop is shared by concurrent requests, so samples of profiled
+    request may include frames of other requests running at the same time.
+    """
+
+    def __init__(self, thread_id: int, interval: float, samples: Counter):
+        super().__init__(name="stack-sampler", daemon=True)
+        self._thread_id = thread_id
+        self._interval = interval
+        self._samples = samples
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+
+            if stack:
+                self._samples[tuple(reversed(stack))] += 1
+
+
+def _write_profile(profile: RequestProfile, duration: float) -> Path:
+    directory = Path(settings.profiling_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", profile.path).strip("_") or "root"
+    name = f"{strftime('%Y%m%d-%H%M%S')}-{profile.method}-{slug}-{int(duration * 1000)}ms"
+
+    if settings.profiling_format == "speedscope":
+        frames: Dict[str, int] = {}
+        samples = []
+        weights = []
+        for stack, count in profile.samples.items():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(count)
+
+        path = directory / f"{name}.speedscope.json"
+        path.write_text(json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": frame} for frame in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{profile.method} {profile.path}",
+                "unit": "none",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }))
+    else:
+        path = directory / f"{name}.collapsed"
+        path.write_text("".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in profile.samples.items()
+        ))
+
+    return path
+
+
+class ProfilingMiddleware:
+    """ASGI middleware enabling per-request profiling and slow-request logging."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    def _should_sample(self, scope: Dict[str, Any]) -> bool:
+        if not settings.profiling_enabled:
+            return False
+
+        headers = dict(scope["headers"])
+
+        if b"x-profile" in headers:
+            token = headers.get(b"x-admin-token")
+            if is_admin_token_valid(token.decode() if token else None):
+                return True
+
+        return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sample = self._should_sample(scope)
+
+        if not sample and settings.slow_request_ms <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current_profile.set(profile)
+
+        sampler = None
+        if sample:
+            sampler = StackSampler(threading.get_ident(), settings.profiling_interval_ms / 1000, profile.samples)
+            sampler.start()
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration = perf_counter() - start
+            _current_profile.reset(token)
+
+            if sampler is not None:
+                await asyncio.to_thread(sampler.stop)
+
+            if 0 < settings.slow_request_ms <= duration * 1000:
+                logger.warning(
+                    "Slow request %s %s: %.1fms (spans: %s)",
+                    profile.method, profile.path, duration * 1000, profile.span_summary() or "none",
+                )
+
+            if sampler is not None:
+                path = await asyncio.to_thread(_write_profile, profile, duration)
+                logger.info("Profile for %s %s saved to %s", profile.method, profile.path, path)
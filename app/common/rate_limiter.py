@@ -7,6 +7,8 @@ from redis.asyncio import Redis
 from fastapi import HTTPException, status, Request, Depends
 
 from app.common.redis_api import get_redis
+from app.common.profiling import profiling_span
+from app.common.tracing import start_span
 
 
 class RateLimiter:
@@ -111,12 +113,13 @@ def rate_limiter_factory(
 
         endpoint_key = endpoint if endpoint else request.url.path
 
-        limited = await rate_limiter.is_limited_atomically(
-            ip_address,
-            endpoint_key,
-            max_requests,
-            window_seconds,
-        )
+        with profiling_span("rate_limiter"), start_span("rate_limiter", endpoint=endpoint_key):
+            limited = await rate_limiter.is_limited_atomically(
+                ip_address,
+                endpoint_key,
+                max_requests,
+                window_seconds,
+            )
 
         if limited:
             raise HTTPException(
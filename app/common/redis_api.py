@@ -1,9 +1,307 @@
+"""
+Redis client with configured connection pool, command pipelining
+batcher and optional client-side caching.
+"""
+
+import asyncio
+import logging
+
+from collections import OrderedDict
 from functools import lru_cache
-from redis.asyncio import Redis
+from typing import Any, Dict
+from redis.asyncio import Redis, BlockingConnectionPool
+from redis.asyncio.connection import Connection, UnixDomainSocketConnection
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialWithJitterBackoff
+from redis.exceptions import RedisError
 
 from app.config import settings
+from app.common.batch_loader import MicroBatcher
+from app.common.tracing import start_span
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_connection_kwargs() -> Dict[str, Any]:
+    """Get connection arguments (TCP or unix socket) from settings."""
+
+    kwargs: Dict[str, Any] = {
+        "socket_timeout": settings.redis_socket_timeout,
+        "health_check_interval": settings.redis_health_check_interval,
+        "retry": Retry(
+            ExponentialWithJitterBackoff(
+                cap=settings.redis_retry_backoff_cap,
+                base=settings.redis_retry_backoff_base,
+            ),
+            settings.redis_retry_attempts,
+        ),
+    }
+
+    if settings.redis_unix_socket_path:
+        kwargs["connection_class"] = UnixDomainSocketConnection
+        kwargs["path"] = settings.redis_unix_socket_path
+    else:
+        kwargs["connection_class"] = Connection
+        kwargs["host"] = settings.redis_host
+        kwargs["port"] = settings.redis_port
+        kwargs["socket_connect_timeout"] = settings.redis_socket_connect_timeout
+
+    return kwargs
+
+
+class TracedRedis(Redis):
+    """Redis client recording each command as tracing span."""
+
+    async def execute_command(self, *args, **options):
+        with start_span(f"redis {args[0]}", **{"db.system": "redis"}):
+            return await super().execute_command(*args, **options)
 
 
 @lru_cache
 def get_redis() -> Redis:
-    return Redis(host=settings.redis_host, port=settings.redis_port)
+    pool = BlockingConnectionPool(
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        **get_connection_kwargs(),
+    )
+    redis_class = TracedRedis if settings.tracing_enabled else Redis
+    return redis_class.from_pool(pool)
+
+
+async def prewarm_redis_pool(redis: Redis, connections: int) -> None:
+    """Open pool connections ahead of first requests."""
+
+    pool = redis.connection_pool
+    count = min(connections, settings.redis_max_connections)
+
+    acquired = await asyncio.gather(*(pool.get_connection() for _ in range(count)))
+    for connection in acquired:
+        await pool.release(connection)
+
+
+class PipelineBatcher(MicroBatcher[tuple]):
+    """
+    Coalesces small commands from concurrent callers into one pipeline.
+
+    Args:
+        redis: Redis client
+        max_batch: Max commands per pipeline
+        window_ms: Time window in milliseconds to collect commands
+    """
+
+    def __init__(self, redis: Redis, max_batch: int = 100, window_ms: float = 0.5):
+        super().__init__(max_batch, window_ms)
+        self._redis = redis
+
+    async def execute(self, *args: Any) -> Any:
+        """
+        Execute command as part of next pipeline.
+
+        Example:
+            value = await batcher.execute("GET", "some:key")
+        """
+
+        return await self.submit(args)
+
+    async def _run_batch(self, commands: list[tuple]) -> list[Any]:
+        with start_span("redis pipeline", commands=len(commands)):
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for args in commands:
+                    pipe.execute_command(*args)
+                return await pipe.execute(raise_on_error=False)
+
+
+@lru_cache
+def get_redis_batcher() -> PipelineBatcher:
+    return PipelineBatcher(
+        get_redis(),
+        max_batch=settings.redis_pipeline_max_batch,
+        window_ms=settings.redis_pipeline_window_ms,
+    )
+
+
+class ClientSideCache:
+    """
+    Local cache for read-mostly keys invalidated by Redis server-assisted
+    client-side caching (RESP3 CLIENT TRACKING in broadcasting mode).
+
+    Dedicated RESP3 connection subscribes to invalidations for configured
+    key prefixes. Reads of matching keys are served from local memory
+    until Redis reports key change. While invalidation connection is down,
+    cache is cleared and bypassed.
+
+    Args:
+        redis: Redis client for reads on cache miss
+        prefixes: Key prefixes to cache
+        max_keys: Max cached keys (LRU eviction)
+    """
+
+    def __init__(self, redis: Redis, prefixes: list[str], max_keys: int = 10_000):
+        self._redis = redis
+        self._prefixes = tuple(prefixes)
+        self._max_keys = max_keys
+
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        self._epoch = 0
+        self._active = False
+        self._task: asyncio.Task | None = None
+
+        self.hits = 0
+        self.misses = 0
+
+    async def start(self) -> None:
+        """Start invalidation listener."""
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop invalidation listener and drop cached values."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        self._invalidate_all()
+
+    async def get(self, key: str, command: str = "GET") -> Any:
+        """
+        Read key with given command (from local cache when possible).
+
+        Example:
+            status = await cache.get("jobs:job:1", "HGETALL")
+        """
+
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+        self.misses += 1
+
+        if not self._active or not key.startswith(self._prefixes):
+            return await self._redis.execute_command(command, key)
+
+        epoch = self._epoch
+        value = await self._redis.execute_command(command, key)
+
+        # Skip caching if any invalidation arrived during read
+        if self._active and epoch == self._epoch:
+            self._data[key] = value
+            if len(self._data) > self._max_keys:
+                self._data.popitem(last=False)
+
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters."""
+
+        total = self.hits + self.misses
+
+        return {
+            "active": self._active,
+            "keys": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else None,
+        }
+
+    def _invalidate_all(self) -> None:
+        self._epoch += 1
+        self._data.clear()
+
+    async def _on_invalidate(self, message: list) -> list:
+        self._epoch += 1
+        keys = message[1]
+
+        if keys is None:
+            self._data.clear()
+        else:
+            for key in keys:
+                self._data.pop(key.decode() if isinstance(key, bytes) else key, None)
+
+        return message
+
+    async def _listen(self) -> None:
+        kwargs = get_connection_kwargs()
+        connection_class = kwargs.pop("connection_class")
+        # Listener blocks on reads indefinitely, so no socket timeout
+        kwargs.update(protocol=3, socket_timeout=None, health_check_interval=0)
+
+        attempt = 0
+
+        while True:
+            connection = connection_class(**kwargs)
+            try:
+                await connection.connect()
+
+                # Async client has no public client-side caching API: parser hook
+                # is checked against pinned redis-py range (requirements.txt)
+                set_handler = getattr(connection._parser, "set_invalidation_push_handler", None)
+                if set_handler is None:
+                    logger.error("Installed redis-py does not support invalidation push handler, client-side cache disabled")
+                    return
+                set_handler(self._on_invalidate)
+
+                args = ["CLIENT", "TRACKING", "ON", "BCAST"]
+                for prefix in self._prefixes:
+                    args += ["PREFIX", prefix]
+                await connection.send_command(*args)
+                await connection.read_response()
+
+                self._active = True
+                attempt = 0
+                logger.info("Redis client-side cache tracking prefixes: %s", list(self._prefixes))
+
+                while True:
+                    await connection.read_response(push_request=True)
+
+            except (RedisError, OSError) as e:
+                logger.warning("Redis client-side cache disconnected: %s", e)
+
+            finally:
+                self._active = False
+                self._invalidate_all()
+                await connection.disconnect()
+
+            attempt += 1
+            await asyncio.sleep(min(settings.redis_retry_backoff_base * 2 ** attempt, settings.redis_retry_backoff_cap * 10))
+
+
+redis_cache: ClientSideCache | None = None
+
+
+async def start_redis_cache(prefixes: list[str]) -> ClientSideCache:
+    """Create and start global client-side cache for given key prefixes."""
+
+    global redis_cache
+
+    redis_cache = ClientSideCache(
+        get_redis(),
+        prefixes=prefixes,
+        max_keys=settings.redis_client_cache_max_keys,
+    )
+    await redis_cache.start()
+
+    return redis_cache
+
+
+async def stop_redis_cache() -> None:
+    """Stop global client-side cache."""
+
+    global redis_cache
+
+    if redis_cache is not None:
+        await redis_cache.stop()
+        redis_cache = None
+
+
+def get_redis_cache() -> ClientSideCache | None:
+    """Get global client-side cache (None if disabled)."""
+
+    return redis_cache
@@ -0,0 +1,16 @@
+"""
+Admin token verification.
+"""
+
+import hmac
+
+from app.config import settings
+
+
+def is_admin_token_valid(token: str | None) -> bool:
+    """Check admin token (always invalid if admin_token is not configured)."""
+
+    if not settings.admin_token or not token:
+        return False
+
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
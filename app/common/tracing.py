@@ -0,0 +1,376 @@
+"""
+Lightweight distributed tracing.
+
+Each HTTP request gets a trace (continued from incoming W3C traceparent
+header when present) with child spans for rate limiter, service calls,
+SQL statements and Redis commands. Finished spans are queued and exported
+in batches by background task, so export never runs on request path.
+
+Exporters are pluggable: subclass SpanExporter and pass it to
+set_span_exporter() before application startup.
+
+Example:
+    with start_span("books.import", rows=100):
+        ...
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from time import time_ns
+from typing import Any, Callable, Dict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+_null_span = nullcontext()
+
+# version-trace_id-parent_id-flags, later versions may append fields
+_TRACEPARENT_PATTERN = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}(-.*)?$")
+
+
+class Span:
+    """Timed operation within trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6 if self.end_ns else None,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+        finish_span(self, exc)
+
+
+class SpanExporter(ABC):
+    """Base class for span exporters."""
+
+    @abstractmethod
+    async def export(self, spans: list[Span]) -> None:
+        """Export batch of finished spans."""
+
+    async def shutdown(self) -> None:
+        """Release exporter resources."""
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps exported spans in memory (for tests and debugging)."""
+
+    def __init__(self, max_spans: int = 10_000):
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    async def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends spans to file as newline-delimited JSON."""
+
+    def __init__(self, path: str):
+        self._path = Path(path)
+
+    def _write(self, lines: str) -> None:
+        with self._path.open("a") as file:
+            file.write(lines)
+
+    async def export(self, spans: list[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        await asyncio.to_thread(self._write, lines)
+
+
+class BatchSpanProcessor:
+    """
+    Queues finished spans and exports them in batches from background task.
+
+    Args:
+        exporter: Span exporter
+        max_queue: Max queued spans (newer spans are dropped when full)
+        max_batch: Max spans per export call
+        interval_ms: Export interval in milliseconds
+    """
+
+    def __init__(self, exporter: SpanExporter, max_queue: int = 10_000, max_batch: int = 512, interval_ms: float = 1000):
+        self.exporter = exporter
+        self._queue: deque[Span] = deque()
+        self._max_queue = max_queue
+        self._max_batch = max_batch
+        self._interval = interval_ms / 1000
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.dropped = 0
+
+    def on_end(self, span: Span) -> None:
+        if len(self._queue) >= self._max_queue:
+            self.dropped += 1
+            return
+
+        self._queue.append(span)
+        if len(self._queue) >= self._max_batch:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+        await self.exporter.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "dropped": self.dropped,
+        }
+
+    async def flush(self) -> None:
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self._max_batch, len(self._queue)))]
+            try:
+                await self.exporter.export(batch)
+            except Exception as e:
+                logger.error("Span export of %s spans failed: %s", len(batch), e)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+_exporter: SpanExporter | None = None
+processor: BatchSpanProcessor | None = None
+
+
+def set_span_exporter(exporter: SpanExporter) -> None:
+    """Use custom span exporter (must be called before tracing is started)."""
+
+    global _exporter
+
+    _exporter = exporter
+
+
+async def start_tracing() -> BatchSpanProcessor:
+    """Create and start global span processor."""
+
+    global processor
+
+    exporter = _exporter
+    if exporter is None:
+        if settings.tracing_exporter == "file":
+            exporter = FileSpanExporter(settings.tracing_file)
+        else:
+            exporter = InMemorySpanExporter()
+
+    processor = BatchSpanProcessor(
+        exporter,
+        max_queue=settings.tracing_queue_size,
+        max_batch=settings.tracing_batch_size,
+        interval_ms=settings.tracing_flush_interval_ms,
+    )
+    await processor.start()
+
+    return processor
+
+
+async def stop_tracing() -> None:
+    """Flush queued spans and stop global span processor."""
+
+    global processor
+
+    if processor is not None:
+        await processor.shutdown()
+        processor = None
+
+
+def get_current_span() -> Span | None:
+    """Get active span of current context."""
+
+    return _current_span.get()
+
+
+def begin_span(name: str, trace_id: str | None = None, parent_id: str | None = None, **attributes: Any) -> Span | None:
+    """
+    Create span without activating it (None when tracing is not running).
+
+    Parent is current span unless trace_id/parent_id are given explicitly.
+    """
+
+    if processor is None:
+        return None
+
+    if trace_id is None:
+        parent = _current_span.get()
+        if parent is None:
+            trace_id = os.urandom(16).hex()
+        else:
+            trace_id = parent.trace_id
+            parent_id = parent.span_id
+
+    return Span(name, trace_id, parent_id, attributes)
+
+
+def finish_span(span: Span | None, error: BaseException | None = None) -> None:
+    """End span and queue it for export."""
+
+    if span is None:
+        return
+
+    span.end_ns = time_ns()
+    if error is not None:
+        span.status = "error"
+        span.attributes["error"] = repr(error)
+
+    if processor is not None:
+        processor.on_end(span)
+
+
+def start_span(name: str, **attributes: Any):
+    """Context manager running block in child span of current span (no-op when tracing is not running)."""
+
+    span = begin_span(name, **attributes)
+    if span is None:
+        return _null_span
+
+    return span
+
+
+def traced(name: str, func: Callable) -> Callable:
+    """Wrap async function so each call runs in named span."""
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with start_span(name):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str] | None:
+    """Parse W3C traceparent header into (trace_id, parent_span_id)."""
+
+    if not header:
+        return None
+
+    match = _TRACEPARENT_PATTERN.match(header.strip().lower())
+    if match is None:
+        return None
+
+    version, trace_id, parent_id, extra = match.groups()
+    # Version ff is invalid, version 00 has exactly four fields
+    if version == "ff" or (version == "00" and extra) or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+
+    return trace_id, parent_id
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Record each SQL statement executed by engine as span."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._trace_span = begin_span("db.query", statement=statement[:200])
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            finish_span(getattr(context, "_trace_span", None))
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        if context is not None:
+            finish_span(getattr(context, "_trace_span", None), exception_context.original_exception)
+
+
+class TracingMiddleware:
+    """ASGI middleware starting root span for each HTTP request."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or processor is None:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = parse_traceparent(value.decode("latin-1"))
+                break
+
+        trace_id, parent_id = traceparent if traceparent else (None, None)
+        span = begin_span(
+            f"{scope['method']} {scope['path']}",
+            trace_id=trace_id,
+            parent_id=parent_id,
+            **{"http.method": scope["method"], "http.path": scope["path"]},
+        )
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = "error"
+            await send(message)
+
+        with span:
+            await self.app(scope, receive, send_wrapper)
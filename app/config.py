@@ -21,12 +21,112 @@ class Settings(BaseSettings):
     # Database settings
     database_url: str = "sqlite+aiosqlite:///database.db"
 
+    # Sharding settings (shard name -> database URL, empty disables sharding)
+    database_shards: dict[str, str] = {}
+    shard_key_header: str = "X-Shard-Key"
+
+    # Batch loader settings (by-ID lookups)
+    batch_loader_window_ms: float = 2.0
+    batch_loader_max_size: int = 100
+    batch_loader_max_ids: int = 100
+
+    # Export settings
+    export_chunk_size: int = 1000
+
+    # Offload settings (pools for CPU-bound services)
+    offload_process_workers: int = 2
+    offload_thread_workers: int = 4
+    offload_max_pending: int = 100
+    offload_timeout: float = 30.0
+    offload_mp_context: str = "spawn"
+
+    # Group commit settings (write-behind batching of inserts)
+    group_commit_enabled: bool = False
+    group_commit_interval_ms: float = 5.0
+    group_commit_max_batch: int = 500
+    group_commit_queue_size: int = 10_000
+    group_commit_enqueue_timeout: float = 1.0
+
     # Redis settings
     redis_host: str = "localhost"
     redis_port: int = 6379
+    redis_unix_socket_path: str | None = None
+
+    # Redis connection pool settings
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 5.0
+    redis_pool_prewarm: int = 10
+    redis_socket_timeout: float | None = 5.0
+    redis_socket_connect_timeout: float | None = 2.0
+    redis_health_check_interval: int = 30
+    redis_retry_attempts: int = 3
+    redis_retry_backoff_base: float = 0.05
+    redis_retry_backoff_cap: float = 1.0
+
+    # Redis pipelining and client-side caching settings
+    redis_pipeline_window_ms: float = 0.5
+    redis_pipeline_max_batch: int = 100
+    redis_client_cache_enabled: bool = False
+    redis_client_cache_prefixes: list[str] = []
+    redis_client_cache_max_keys: int = 10_000
+
+    # Background jobs settings
+    jobs_stream: str = "jobs"
+    jobs_group: str = "workers"
+    jobs_concurrency: int = 4
+    jobs_max_retries: int = 3
+    jobs_retry_backoff_base: float = 1.0
+    jobs_retry_backoff_max: float = 60.0
+    jobs_claim_idle_ms: int = 300_000
+    jobs_result_ttl: int = 86_400
+
+    # Admin token for privileged diagnostics (empty disables token access)
+    admin_token: str = ""
+
+    # Profiling settings
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5.0
+    profiling_dir: str = "profiles"
+    profiling_format: str = "collapsed"
+    slow_request_ms: float = 0.0
+
+    # Tracing settings
+    tracing_enabled: bool = False
+    tracing_exporter: str = "memory"
+    tracing_file: str = "traces.ndjson"
+    tracing_batch_size: int = 512
+    tracing_flush_interval_ms: float = 1000.0
+    tracing_queue_size: int = 10_000
+
+    # Load shedding settings (adaptive concurrency limit)
+    load_shedding_enabled: bool = False
+    load_shedding_initial_limit: int = 64
+    load_shedding_min_limit: int = 4
+    load_shedding_max_limit: int = 512
+    load_shedding_latency_target_ms: float = 250.0
+    load_shedding_backoff: float = 0.9
+    load_shedding_retry_after: int = 1
+    load_shedding_critical_reserve: int = 4
+    # "[METHOD ]path" -> priority class; path is prefix, or exact path when ending with "$"
+    load_shedding_priorities: dict[str, str] = {
+        "/api/v1/admin": "critical",
+        "GET /api/v1/books$": "bulk",
+        "/api/v1/books/export": "bulk",
+        "/static": "bulk",
+    }
+
+    # Diagnostics settings
+    loop_monitor_interval_ms: float = 500.0
+    loop_lag_warning_ms: float = 0.0
+    diagnostics_scan_limit: int = 10000
 
-    # Logging
-    log_level: str = "DEBUG"
+    # Logging settings (queued, written by background thread)
+    log_level: str = "INFO"
+    log_levels: dict[str, str] = {}
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    log_debug_sample_rate: float = 1.0
 
     class Config:
         env_file = ".env"
@@ -5,18 +5,21 @@ FastAPI application with plugin-based updates system.
 import logging
 
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
+from app.common.profiling import ProfilingMiddleware
+from app.common.tracing import TracingMiddleware
 
+from .logs import setup_logging, RequestIdMiddleware
 from .lifespan import lifespan
+from .load_shedding import LoadSheddingMiddleware, init_concurrency_limiter
+from .offload import OffloadQueueFullError, OffloadTimeoutError
 
 
-logging.basicConfig(
-    level=settings.log_level,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -28,13 +31,49 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Also handles slow-request logging, which works without profiling
+if settings.profiling_enabled or settings.slow_request_ms > 0:
+    app.add_middleware(ProfilingMiddleware)
+    if settings.profiling_enabled:
+        logger.info("Request profiling enabled")
+
+if settings.tracing_enabled:
+    app.add_middleware(TracingMiddleware)
+
+# Runs before profiling and tracing: overload is rejected before any other work
+if settings.load_shedding_enabled:
+    app.add_middleware(LoadSheddingMiddleware, limiter=init_concurrency_limiter())
+    logger.info("Load shedding enabled")
+
+# Outermost: every log record of request (including rejected ones) gets request ID
+app.add_middleware(RequestIdMiddleware)
+
+
+@app.exception_handler(OffloadQueueFullError)
+async def offload_queue_full_handler(request: Request, exc: OffloadQueueFullError):
+    """Reject request when offload pools are saturated."""
+
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy. Please try again later"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(OffloadTimeoutError)
+async def offload_timeout_handler(request: Request, exc: OffloadTimeoutError):
+    """Report offloaded call timeout."""
+
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
 # Mount static files
 static_path = Path("static")
 if static_path.exists():
     app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
-    logger.info(f"Static files mounted at /static from {static_path}")
+    logger.info("Static files mounted at /static from %s", static_path)
 else:
-    logger.warning(f"Static directory not found: {static_path}")
+    logger.warning("Static directory not found: %s", static_path)
 
 
 #@app.get("/", tags=["Root"])
@@ -1,10 +1,27 @@
 """
 Database configuration and session management.
+
+Optional sharding: when database_shards is configured, rows are spread
+across several databases. Shard of row is encoded in its ID
+(id % shards_count), so by-ID lookups always go to one shard. New rows
+are placed into shard chosen by placement key header or spread evenly.
+
+Placement key only chooses shard for new rows, it is not tenant isolation:
+shard holds rows of all keys mapped to it (and rows created without key),
+so reads ignore the key and always cover all shards (or shard owning ID).
+Tables live only in shards; rows left in default database must be moved
+with python -m app rebalance.
 """
 
-from typing import Annotated, AsyncGenerator
-from fastapi import Depends
+import asyncio
+import heapq
+import logging
+import zlib
 
+from typing import Annotated, Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Iterable
+from fastapi import Depends, Request
+
+from sqlalchemy import func, inspect, select, true
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -15,6 +32,12 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
+from app.common.redis_api import get_redis
+from app.common.profiling import profiling_span
+from app.common.tracing import instrument_engine
+
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
@@ -40,21 +63,30 @@ def init_database(database_url: str | None = None) -> None:
         database_url = settings.database_url
 
     engine = create_async_engine(database_url, echo=False)
+    if settings.tracing_enabled:
+        instrument_engine(engine)
     session_factory = async_sessionmaker(engine, expire_on_commit=False)
 
+    if settings.database_shards:
+        init_shards(settings.database_shards)
+
 
 async def create_tables() -> None:
-    """Create all tables from registered models."""
+    """Create all tables from registered models (on every shard instead when sharding is enabled)."""
 
     if engine is None:
         raise RuntimeError("Database not initialized")
 
+    if shard_router is not None:
+        await shard_router.run_sync_all(Base.metadata.create_all)
+        return
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
 async def drop_tables() -> None:
-    """Drop all tables."""
+    """Drop all tables (on every shard when sharding is enabled)."""
 
     if engine is None:
         raise RuntimeError("Database not initialized")
@@ -62,6 +94,9 @@ async def drop_tables() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+    if shard_router is not None:
+        await shard_router.run_sync_all(Base.metadata.drop_all)
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting database session."""
@@ -69,8 +104,24 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     if session_factory is None:
         raise RuntimeError("Database not initialized")
 
-    async with session_factory() as session:
+    session = session_factory()
+
+    try:
+        # With sharding default session is not queried: services open shard sessions themselves
+        if shard_router is None:
+            await _connect(session)
+
         yield session
+    finally:
+        with profiling_span("db.session_close"):
+            await session.close()
+
+
+async def _connect(session: AsyncSession) -> None:
+    # Session acquires connection lazily on first query: acquire it here,
+    # so pool wait is recorded as session setup instead of first query
+    with profiling_span("db.session_setup"):
+        await session.connection()
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
@@ -83,3 +134,297 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
         raise RuntimeError("Database not initialized")
 
     return session_factory
+
+
+_SYNC_SEQUENCE_SCRIPT = """
+local current = tonumber(redis.call("GET", KEYS[1]) or "0")
+if current < tonumber(ARGV[1]) then
+    redis.call("SET", KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+class ShardRouter:
+    """
+    Holds engines of all shards and routes sessions to them.
+
+    Args:
+        shard_urls: Dict mapping shard name to database URL
+    """
+
+    def __init__(self, shard_urls: Dict[str, str]):
+        self.names = sorted(shard_urls)
+        self.engines: Dict[str, AsyncEngine] = {}
+        self.session_factories: Dict[str, async_sessionmaker[AsyncSession]] = {}
+
+        for name in self.names:
+            shard_engine = create_async_engine(shard_urls[name], echo=False)
+            if settings.tracing_enabled:
+                instrument_engine(shard_engine)
+            self.engines[name] = shard_engine
+            self.session_factories[name] = async_sessionmaker(shard_engine, expire_on_commit=False)
+
+    def shard_for_key(self, key: int) -> str:
+        """Get shard holding row with given ID."""
+
+        return self.names[key % len(self.names)]
+
+    def shard_for_placement(self, key: str) -> str:
+        """Get shard for placement key (key may also name shard directly)."""
+
+        if key in self.engines:
+            return key
+
+        return self.names[zlib.crc32(key.encode()) % len(self.names)]
+
+    def session(self, shard: str) -> AsyncSession:
+        """Create session bound to shard."""
+
+        session = self.session_factories[shard]()
+        session.info["shard"] = shard
+        return session
+
+    async def allocate_id(self, sequence: str, shard: str | None = None) -> tuple[int, str]:
+        """
+        Allocate globally unique ID for new row.
+
+        Args:
+            sequence: Sequence name (usually table name)
+            shard: Target shard (spread evenly by sequence if None)
+
+        Returns:
+            Tuple (id, shard), where shard_for_key(id) == shard
+        """
+
+        value = await get_redis().incr(f"shards:sequence:{sequence}")
+
+        if shard is None:
+            shard = self.names[value % len(self.names)]
+
+        return value * len(self.names) + self.names.index(shard), shard
+
+    async def sync_sequence(self, model: type) -> None:
+        """Move ID sequence of model ahead of max existing ID on all shards."""
+
+        pk = model.__mapper__.primary_key[0]
+
+        try:
+            results = await self.scatter(lambda session: session.scalar(select(func.max(pk))))
+        except Exception as e:
+            logger.warning("Could not read max ID of %s: %s", model.__tablename__, e)
+            return
+
+        max_id = max((value for value in results.values() if value is not None), default=0)
+
+        await get_redis().eval(
+            _SYNC_SEQUENCE_SCRIPT,
+            1,
+            f"shards:sequence:{model.__tablename__}",
+            max_id // len(self.names) + 1,
+        )
+
+    async def run(self, shard: str, fn: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        """Run fn(session) on shard."""
+
+        async with self.session(shard) as session:
+            return await fn(session)
+
+    async def scatter(
+            self,
+            fn: Callable[[AsyncSession], Awaitable[Any]],
+            shards: Iterable[str] | None = None,
+    ) -> Dict[str, Any]:
+        """Run fn(session) concurrently on shards (all by default), returning results by shard."""
+
+        names = list(shards) if shards is not None else self.names
+        results = await asyncio.gather(*(self.run(name, fn) for name in names))
+
+        return dict(zip(names, results))
+
+    async def gather(
+            self,
+            fn: Callable[[AsyncSession], Awaitable[list]],
+            key: Callable[[Any], Any],
+            shards: Iterable[str] | None = None,
+    ) -> list:
+        """Scatter fn and merge per-shard lists (each sorted by key) into one sorted list."""
+
+        results = await self.scatter(fn, shards)
+
+        return list(heapq.merge(*results.values(), key=key))
+
+    async def stream(
+            self,
+            fn: Callable[[AsyncSession], AsyncIterator[Any]],
+    ) -> AsyncIterator[Any]:
+        """Chain async iterators produced by fn(session) over all shards, shard by shard."""
+
+        for name in self.names:
+            async with self.session(name) as session:
+                async for item in fn(session):
+                    yield item
+
+    async def run_sync_all(self, fn: Callable) -> None:
+        """Run sync DDL function (e.g. metadata.create_all) on all shards."""
+
+        async def run_sync(shard_engine: AsyncEngine) -> None:
+            async with shard_engine.begin() as conn:
+                await conn.run_sync(fn)
+
+        await asyncio.gather(*(run_sync(shard_engine) for shard_engine in self.engines.values()))
+
+    async def rebalance(
+            self,
+            model: type,
+            chunk_size: int = 1000,
+            dry_run: bool = False,
+            default_session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> Dict[str, int]:
+        """
+        Move rows to shards matching their IDs (after shards were added or removed).
+
+        Rows are copied with merge (idempotent) before deletion from source shard,
+        so interrupted rebalance can be safely restarted. Rows of removed shard
+        must first be copied into any remaining shard.
+
+        Args:
+            model: Model to rebalance
+            chunk_size: Rows moved per transaction
+            dry_run: Only count rows to move
+            default_session_factory: Also move all rows left in default (non-sharded) database
+
+        Returns:
+            Dict mapping source (shard or "default") to count of moved (or to be moved on dry run) rows
+        """
+
+        pk = model.__mapper__.primary_key[0]
+        count = len(self.names)
+        moved: Dict[str, int] = {}
+
+        if default_session_factory is not None:
+            async with default_session_factory() as source_session:
+                if await _has_table(source_session, model):
+                    moved["default"] = await self._move_rows(source_session, "default", model, true(), chunk_size, dry_run)
+
+        for index, source in enumerate(self.names):
+            async with self.session(source) as source_session:
+                moved[source] = await self._move_rows(source_session, source, model, pk % count != index, chunk_size, dry_run)
+
+        if not dry_run:
+            await self.sync_sequence(model)
+
+        return moved
+
+    async def _move_rows(
+            self,
+            source_session: AsyncSession,
+            source: str,
+            model: type,
+            where: Any,
+            chunk_size: int,
+            dry_run: bool,
+    ) -> int:
+        mapper = model.__mapper__
+        pk = mapper.primary_key[0]
+
+        if dry_run:
+            return await source_session.scalar(select(func.count()).select_from(model).where(where))
+
+        moved = 0
+
+        while True:
+            query = select(model).where(where).order_by(pk).limit(chunk_size)
+            rows = list((await source_session.execute(query)).scalars().all())
+            if not rows:
+                break
+
+            by_target: Dict[str, list] = {}
+            for row in rows:
+                by_target.setdefault(self.shard_for_key(getattr(row, pk.key)), []).append(row)
+
+            for target, target_rows in by_target.items():
+                async with self.session(target) as target_session:
+                    for row in target_rows:
+                        values = {attr.key: getattr(row, attr.key) for attr in mapper.column_attrs}
+                        await target_session.merge(model(**values))
+                    await target_session.commit()
+
+            for row in rows:
+                await source_session.delete(row)
+            await source_session.commit()
+
+            moved += len(rows)
+            logger.info("Rebalance: moved %s rows of %s from %s", moved, model.__tablename__, source)
+
+        return moved
+
+    async def dispose(self) -> None:
+        """Close all shard engines."""
+
+        await asyncio.gather(*(shard_engine.dispose() for shard_engine in self.engines.values()))
+
+
+shard_router: ShardRouter | None = None
+
+
+def init_shards(shard_urls: Dict[str, str]) -> None:
+    """Initialize shard router."""
+
+    global shard_router
+
+    shard_router = ShardRouter(shard_urls)
+    logger.info("Sharding enabled with %s shards: %s", len(shard_router.names), shard_router.names)
+
+
+async def _has_table(session: AsyncSession, model: type) -> bool:
+    return await session.run_sync(lambda sync_session: inspect(sync_session.connection()).has_table(model.__tablename__))
+
+
+async def count_unsharded_rows(model: type) -> int:
+    """Count rows of model left in default database (0 if it has no such table)."""
+
+    async with get_session_factory()() as session:
+        if not await _has_table(session, model):
+            return 0
+
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+def get_shard_router() -> ShardRouter | None:
+    """Get shard router (None if sharding is disabled)."""
+
+    return shard_router
+
+
+def get_session_shard(session: AsyncSession) -> str | None:
+    """Get shard session is bound to (None for default database session)."""
+
+    return session.info.get("shard")
+
+
+async def get_shard_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting session of shard chosen by placement key header (writes only).
+
+    Without placement key (or with sharding disabled) yields default database
+    session; shard-aware services then route by ID or scatter across all shards.
+    Reads must use SessionDep: shard holds rows of all keys mapped to it, so
+    shard session would return neither rows of one key nor all rows.
+    """
+
+    key = request.headers.get(settings.shard_key_header)
+
+    if shard_router is None or not key:
+        async with get_session_factory()() as session:
+            if shard_router is None:
+                await _connect(session)
+            yield session
+        return
+
+    async with shard_router.session(shard_router.shard_for_placement(key)) as session:
+        await _connect(session)
+        yield session
+
+
+ShardSessionDep = Annotated[AsyncSession, Depends(get_shard_session)]
@@ -0,0 +1,243 @@
+"""
+Runtime diagnostics: event-loop lag monitor and snapshot of pools,
+caches, limiters and plugin registry for admin diagnostics endpoint.
+
+Snapshot only reads counters already kept by components (plus one
+bounded SCAN for rate limiter keys), so it is cheap to collect
+on a loaded server.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import threading
+
+from collections import deque
+from time import monotonic
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.common import tracing
+from app.common.redis_api import get_redis, get_redis_cache
+
+from . import database
+from .group_commit import get_group_commit_writer
+from .hooks import registry
+from .load_shedding import get_concurrency_limiter
+from .logs import get_log_handler
+from .offload import get_offload_executor
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopMonitor:
+    """
+    Measures event-loop lag: how late sleep of fixed interval wakes up.
+
+    Args:
+        interval_ms: Measurement interval in milliseconds
+        window: Number of recent measurements kept for avg/max
+        warning_ms: Log warning when lag exceeds this value (0 to disable)
+    """
+
+    def __init__(self, interval_ms: float = 500.0, window: int = 120, warning_ms: float = 0.0):
+        self._interval = interval_ms / 1000
+        self._warning = warning_ms / 1000
+        self._samples: deque[float] = deque(maxlen=window)
+        self._task: asyncio.Task | None = None
+
+        self.last = 0.0
+        self.peak = 0.0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get lag in milliseconds (last, avg and max over window, max since start)."""
+
+        samples = self._samples
+
+        return {
+            "interval_ms": self._interval * 1000,
+            "lag_ms": round(self.last * 1000, 3),
+            "avg_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else None,
+            "max_ms": round(max(samples) * 1000, 3) if samples else None,
+            "peak_ms": round(self.peak * 1000, 3),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            start = monotonic()
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, monotonic() - start - self._interval)
+
+            self.last = lag
+            self.peak = max(self.peak, lag)
+            self._samples.append(lag)
+
+            if 0 < self._warning < lag:
+                logger.warning("Event loop lag %.1fms", lag * 1000)
+
+
+loop_monitor: EventLoopMonitor | None = None
+
+
+async def start_loop_monitor() -> EventLoopMonitor:
+    """Create and start global event-loop monitor."""
+
+    global loop_monitor
+
+    loop_monitor = EventLoopMonitor(
+        interval_ms=settings.loop_monitor_interval_ms,
+        warning_ms=settings.loop_lag_warning_ms,
+    )
+    await loop_monitor.start()
+
+    return loop_monitor
+
+
+async def stop_loop_monitor() -> None:
+    """Stop global event-loop monitor."""
+
+    global loop_monitor
+
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+        loop_monitor = None
+
+
+def get_loop_monitor() -> EventLoopMonitor | None:
+    """Get global event-loop monitor (None if not started)."""
+
+    return loop_monitor
+
+
+def get_engine_pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """Get connection pool counters of engine (only those supported by pool class)."""
+
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__, "status": pool.status()}
+
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+
+    return stats
+
+
+def get_redis_pool_stats() -> Dict[str, Any]:
+    """Get Redis connection pool usage."""
+
+    pool = get_redis().connection_pool
+
+    return {
+        "max_connections": pool.max_connections,
+        "in_use": len(getattr(pool, "_in_use_connections", ())),
+        "available": len(getattr(pool, "_available_connections", ())),
+    }
+
+
+async def count_rate_limiter_keys(limit: int) -> Dict[str, Any]:
+    """Count rate limiter keys with SCAN (stops after limit keys)."""
+
+    count = 0
+    async for _ in get_redis().scan_iter(match="rate_limiter:*", count=1000):
+        count += 1
+        if count >= limit:
+            break
+
+    return {"keys": count, "truncated": count >= limit}
+
+
+def get_process_stats() -> Dict[str, Any]:
+    """Get task, thread, GC and memory stats of current process."""
+
+    rss = None
+    try:
+        with open("/proc/self/statm") as file:
+            rss = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+
+    peak_rss = None
+    try:
+        import resource
+
+        # ru_maxrss is in kilobytes on Linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        pass
+
+    return {
+        "pid": os.getpid(),
+        "tasks": len(asyncio.all_tasks()),
+        "threads": threading.active_count(),
+        "gc": {
+            "enabled": gc.isenabled(),
+            "counts": gc.get_count(),
+            "generations": gc.get_stats(),
+        },
+        "memory": {
+            "rss_bytes": rss,
+            "peak_rss_bytes": peak_rss,
+        },
+    }
+
+
+async def collect_diagnostics() -> Dict[str, Any]:
+    """Collect diagnostics snapshot."""
+
+    shard_router = database.get_shard_router()
+    monitor = get_loop_monitor()
+    limiter = get_concurrency_limiter()
+    executor = get_offload_executor()
+    redis_cache = get_redis_cache()
+    writer = get_group_commit_writer()
+    log_handler = get_log_handler()
+
+    return {
+        "event_loop": monitor.stats() if monitor is not None else None,
+        "process": get_process_stats(),
+        "database": {
+            "engine": get_engine_pool_stats(database.engine) if database.engine is not None else None,
+            "shards": {
+                name: get_engine_pool_stats(engine)
+                for name, engine in shard_router.engines.items()
+            } if shard_router is not None else None,
+        },
+        "redis": {
+            "pool": get_redis_pool_stats(),
+            "client_cache": redis_cache.stats() if redis_cache is not None else None,
+        },
+        "rate_limiter": await count_rate_limiter_keys(settings.diagnostics_scan_limit),
+        "load_shedding": limiter.stats() if limiter is not None else None,
+        "offload": executor.stats() if executor is not None else None,
+        "group_commit": writer.stats() if writer is not None else None,
+        "tracing": tracing.processor.stats() if tracing.processor is not None else None,
+        "logging": {
+            "queued": log_handler.queue.qsize(),
+            "dropped": log_handler.dropped,
+        } if log_handler is not None else None,
+        # Services keeping own counters (e.g. batch loaders)
+        "services": {
+            name: service.stats()
+            for name, service in registry.services.items()
+            if callable(getattr(service, "stats", None))
+        },
+        "registry": registry.origins,
+    }
@@ -0,0 +1,207 @@
+"""
+Write-behind group commit for ORM inserts.
+
+Inserts are enqueued to a background writer task which flushes them
+in one transaction every N ms or M rows and resolves waiting callers.
+"""
+
+import asyncio
+import logging
+
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueueFullError(RuntimeError):
+    """Raised when write queue stays full longer than enqueue timeout."""
+
+
+class GroupCommitWriter:
+    """
+    Background writer committing queued ORM objects in batches.
+
+    Args:
+        session_factory: Async session factory for database operations
+        max_batch: Max objects per transaction
+        interval_ms: Max time in milliseconds to wait for batch to fill
+        queue_size: Max queued objects (backpressure limit)
+        enqueue_timeout: Seconds to wait for free queue slot before failing
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            max_batch: int = 500,
+            interval_ms: float = 5.0,
+            queue_size: int = 10_000,
+            enqueue_timeout: float = 1.0,
+    ):
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._interval = interval_ms / 1000
+        self._enqueue_timeout = enqueue_timeout
+
+        self._queue: asyncio.Queue[tuple[Any, asyncio.Future]] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+        self._flushing: asyncio.Future | None = None
+
+    async def start(self) -> None:
+        """Start background writer task."""
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush queued objects and stop writer task."""
+
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._flushing is not None:
+            await self._flushing
+
+        while not self._queue.empty():
+            await self._flush(self._drain(self._max_batch))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get writer state."""
+
+        return {
+            "running": self._task is not None,
+            "queued": self._queue.qsize(),
+            "max_queued": self._queue.maxsize,
+        }
+
+    async def submit(self, obj: Any) -> Any:
+        """
+        Enqueue object for insert and wait until it is committed.
+
+        Returns:
+            The same object with database-generated fields (e.g. id) populated
+
+        Raises:
+            WriteQueueFullError: If queue is full for longer than enqueue timeout
+        """
+
+        if self._task is None:
+            raise RuntimeError("Group commit writer is not running")
+
+        future = asyncio.get_running_loop().create_future()
+
+        try:
+            await asyncio.wait_for(self._queue.put((obj, future)), self._enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise WriteQueueFullError("Write queue is full")
+
+        return await future
+
+    def _drain(self, limit: int) -> list[tuple[Any, asyncio.Future]]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._interval
+
+            try:
+                while len(batch) < self._max_batch:
+                    batch.extend(self._drain(self._max_batch - len(batch)))
+                    timeout = deadline - loop.time()
+                    if len(batch) >= self._max_batch or timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            finally:
+                # Collected batch is flushed even if writer is being stopped
+                self._flushing = asyncio.ensure_future(self._flush(batch))
+
+            await asyncio.shield(self._flushing)
+
+    async def _flush(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        if not batch:
+            return
+
+        try:
+            async with self._session_factory() as session:
+                session.add_all([obj for obj, _ in batch])
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error("Group commit of 1 object failed: %s", e)
+                self._resolve(batch, e)
+                return
+
+            # One bad row must not fail unrelated callers: commit rows one by one
+            logger.warning("Group commit of %s objects failed, retrying one by one: %s", len(batch), e)
+            for item in batch:
+                await self._flush([item])
+            return
+
+        logger.debug("Group commit flushed %s objects", len(batch))
+        self._resolve(batch)
+
+    @staticmethod
+    def _resolve(batch: list[tuple[Any, asyncio.Future]], error: Exception | None = None) -> None:
+        for obj, future in batch:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(obj)
+            else:
+                future.set_exception(error)
+
+
+writer: GroupCommitWriter | None = None
+
+
+async def start_group_commit(session_factory: async_sessionmaker[AsyncSession]) -> GroupCommitWriter:
+    """Create and start global group commit writer."""
+
+    global writer
+
+    writer = GroupCommitWriter(
+        session_factory,
+        max_batch=settings.group_commit_max_batch,
+        interval_ms=settings.group_commit_interval_ms,
+        queue_size=settings.group_commit_queue_size,
+        enqueue_timeout=settings.group_commit_enqueue_timeout,
+    )
+    await writer.start()
+
+    return writer
+
+
+async def stop_group_commit() -> None:
+    """Flush and stop global group commit writer."""
+
+    global writer
+
+    if writer is not None:
+        await writer.stop()
+        writer = None
+
+
+def get_group_commit_writer() -> GroupCommitWriter | None:
+    """Get global group commit writer (None if group commit is disabled)."""
+
+    return writer
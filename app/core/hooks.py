@@ -52,12 +52,15 @@ class AppHookSpec:
         """
         Register service functions.
 
+        Sync CPU-bound services can be marked with app.core.offload.cpu_bound()
+        to run in process (or thread) pool instead of event loop.
+
         Args:
             session_factory: Async session factory for database operations
 
         Returns:
             Dict mapping function name to (priority, function)
-            Example: {"get_all_books": (1, get_all_books)}
+            Example: {"get_all_books": (1, get_all_books), "parse_import": (1, cpu_bound(parse_import))}
         """
 
     @hookspec
@@ -70,6 +73,32 @@ class AppHookSpec:
             Example: {"/books": (1, books_router), "/users": (1, users_router)}
         """
 
+    @hookspec
+    def register_profiling_spans(self) -> Dict[str, tuple[int, str]]:
+        """
+        Register profiling spans for services.
+
+        Each call of listed service is recorded as named span
+        in request profile (when profiling is enabled).
+
+        Returns:
+            Dict mapping service name to (priority, span_name)
+            Example: {"get_all_books": (1, "db.get_all_books")}
+        """
+
+    @hookspec
+    def register_jobs(self) -> Dict[str, tuple[int, Any]]:
+        """
+        Register background job handlers.
+
+        Handlers are called by job workers as handler(ctx, **payload),
+        where ctx is app.core.jobs.JobContext.
+
+        Returns:
+            Dict mapping job name to (priority, handler)
+            Example: {"setup_database": (1, setup_database_job)}
+        """
+
 
 class HooksRegistry:
     """
@@ -82,6 +111,9 @@ class HooksRegistry:
         self._schemas: Dict[str, Type] = {}
         self._services: Dict[str, Any] = {}
         self._routers: Dict[str, Any] = {}
+        self._jobs: Dict[str, Any] = {}
+        self._profiling_spans: Dict[str, str] = {}
+        self._origins: Dict[str, Dict[str, Dict[str, Any]]] = {}
 
     @property
     def models(self) -> Dict[str, Type]:
@@ -107,6 +139,24 @@ class HooksRegistry:
 
         return self._routers
 
+    @property
+    def jobs(self) -> Dict[str, Any]:
+        """Get all registered job handlers."""
+
+        return self._jobs
+
+    @property
+    def profiling_spans(self) -> Dict[str, str]:
+        """Get profiling span names by service name."""
+
+        return self._profiling_spans
+
+    @property
+    def origins(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Get update and priority that won each name, by category."""
+
+        return self._origins
+
     def get_model(self, name: str) -> Type | None:
         """Get model by name."""
 
@@ -127,6 +177,11 @@ class HooksRegistry:
 
         return self._routers.get(prefix)
 
+    def get_job(self, name: str) -> Any | None:
+        """Get job handler by name."""
+
+        return self._jobs.get(name)
+
 
 registry: HooksRegistry = HooksRegistry()
 
@@ -135,7 +190,9 @@ def merge_with_priority(
     existing: Dict[str, Any],
     new_items: Dict[str, tuple[int, Any]],
     priorities: Dict[str, int],
-    category: str
+    category: str,
+    source: str | None = None,
+    origins: Dict[str, Dict[str, Any]] | None = None,
 ) -> None:
     """
     Merge new items into existing dict using priority resolution.
@@ -145,13 +202,17 @@ def merge_with_priority(
         new_items: Dict of name -> (priority, item)
         priorities: Dict tracking current priority for each name
         category: Category name for logging
+        source: Name of update providing new items
+        origins: Dict tracking update and priority that won each name
     """
     for name, (priority, item) in new_items.items():
         current_priority = priorities.get(name, -1)
         if priority > current_priority:
             if name in existing:
-                logger.debug(f"{category} '{name}': priority {priority} > {current_priority}, overriding")
+                logger.debug("%s '%s': priority %s > %s, overriding", category, name, priority, current_priority)
             existing[name] = item
             priorities[name] = priority
+            if origins is not None:
+                origins[name] = {"update": source, "priority": priority}
         else:
-            logger.debug(f"{category} '{name}': priority {priority} <= {current_priority}, skipping")
+            logger.debug("%s '%s': priority %s <= %s, skipping", category, name, priority, current_priority)
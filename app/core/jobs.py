@@ -0,0 +1,428 @@
+"""
+Background jobs on Redis Streams.
+
+Jobs are appended to a stream and consumed by worker processes
+(python -m app worker) through a consumer group. Job handlers are
+contributed by updates via the register_jobs hook.
+
+Example:
+    # In update
+    @hookimpl
+    def register_jobs(self):
+        return {"export_books": (1, export_books_job)}
+
+    # Handler
+    async def export_books_job(ctx: JobContext, fmt: str):
+        await ctx.set_progress(50)
+        return {"rows": 100}
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import signal
+import socket
+import uuid
+
+from functools import lru_cache
+from time import time
+from typing import Any, Dict
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from app.config import settings
+from app.common.redis_api import PipelineBatcher, get_redis, get_redis_batcher, get_redis_cache
+
+from .database import init_database, get_session_factory
+from .hooks import registry
+from .logs import request_id_var
+from .offload import start_offload, stop_offload
+from .updates_engine import initialize_updates
+
+
+logger = logging.getLogger(__name__)
+
+# Worker poll retry delay bounds (seconds) while Redis is unavailable
+POLL_BACKOFF_MIN = 0.5
+POLL_BACKOFF_MAX = 30.0
+
+
+def _decode(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class JobContext:
+    """Context passed to job handlers."""
+
+    def __init__(self, queue: "JobQueue", job_id: str, attempt: int):
+        self.queue = queue
+        self.job_id = job_id
+        self.attempt = attempt
+
+    async def set_progress(self, progress: int, message: str | None = None) -> None:
+        """Report job progress (0-100) with optional message."""
+
+        fields: Dict[str, Any] = {"progress": max(0, min(100, progress))}
+        if message is not None:
+            fields["message"] = message
+
+        await self.queue.update(self.job_id, **fields)
+
+
+def get_job_status_prefix() -> str:
+    """Get key prefix of job status hashes."""
+
+    return f"{settings.jobs_stream}:job:"
+
+
+class JobQueue:
+    """
+    Job queue on Redis Streams with per-job status hashes.
+
+    Args:
+        redis: Redis client
+        batcher: Pipeline batcher for status reads (polled by many clients at once)
+    """
+
+    def __init__(self, redis: Redis, batcher: PipelineBatcher | None = None):
+        self._redis = redis
+        self._batcher = batcher
+        self._stream = settings.jobs_stream
+        self._group = settings.jobs_group
+        self._delayed = f"{settings.jobs_stream}:delayed"
+
+    def _status_key(self, job_id: str) -> str:
+        return f"{get_job_status_prefix()}{job_id}"
+
+    async def ensure_group(self) -> None:
+        """Create consumer group (and stream) if not exists."""
+
+        try:
+            await self._redis.xgroup_create(self._stream, self._group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def enqueue(self, name: str, **payload: Any) -> str:
+        """
+        Enqueue job.
+
+        Args:
+            name: Registered job name
+            payload: JSON-serializable keyword arguments for job handler
+
+        Returns:
+            Job ID
+        """
+
+        job_id = uuid.uuid4().hex
+        now = time()
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            await pipe.hset(self._status_key(job_id), mapping={
+                "name": name,
+                "status": "queued",
+                "progress": 0,
+                "attempts": 0,
+                "created_at": now,
+                "updated_at": now,
+            })
+            await pipe.expire(self._status_key(job_id), settings.jobs_result_ttl)
+            await pipe.xadd(self._stream, {
+                "job_id": job_id,
+                "name": name,
+                "payload": json.dumps(payload),
+                "attempt": 0,
+            })
+            await pipe.execute()
+
+        return job_id
+
+    async def get_status(self, job_id: str) -> Dict[str, Any] | None:
+        """
+        Get job status, progress and result (None if unknown or expired).
+
+        Served from client-side cache when it is running (status hashes
+        of finished jobs no longer change), otherwise read in pipeline
+        batch together with concurrent reads.
+        """
+
+        key = self._status_key(job_id)
+        cache = get_redis_cache()
+
+        if cache is not None:
+            raw = await cache.get(key, "HGETALL")
+        elif self._batcher is not None:
+            raw = await self._batcher.execute("HGETALL", key)
+        else:
+            raw = await self._redis.hgetall(key)
+        if not raw:
+            return None
+
+        data = {_decode(k): _decode(v) for k, v in raw.items()}
+
+        status = {
+            "job_id": job_id,
+            "name": data.get("name"),
+            "status": data.get("status"),
+            "progress": int(data.get("progress", 0)),
+            "attempts": int(data.get("attempts", 0)),
+            "message": data.get("message"),
+            "error": data.get("error"),
+            "result": json.loads(data["result"]) if "result" in data else None,
+            "created_at": float(data["created_at"]),
+            "updated_at": float(data["updated_at"]),
+        }
+
+        return status
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        """Update job status fields."""
+
+        fields["updated_at"] = time()
+        await self._redis.hset(self._status_key(job_id), mapping=fields)
+
+    async def read(self, consumer: str, count: int, block_ms: int) -> list[tuple[str, Dict[str, Any]]]:
+        """Read new messages for consumer."""
+
+        response = await self._redis.xreadgroup(
+            self._group,
+            consumer,
+            {self._stream: ">"},
+            count=count,
+            block=block_ms,
+        )
+
+        return [
+            (_decode(message_id), {_decode(k): _decode(v) for k, v in fields.items()})
+            for _, messages in response or []
+            for message_id, fields in messages
+        ]
+
+    async def claim_stale(self, consumer: str, count: int) -> list[tuple[str, Dict[str, Any]]]:
+        """Claim messages left pending by crashed consumers."""
+
+        response = await self._redis.xautoclaim(
+            self._stream,
+            self._group,
+            consumer,
+            min_idle_time=settings.jobs_claim_idle_ms,
+            count=count,
+        )
+
+        return [
+            (_decode(message_id), {_decode(k): _decode(v) for k, v in fields.items()})
+            for message_id, fields in response[1]
+            if fields
+        ]
+
+    async def touch(self, consumer: str, message_ids: list[str]) -> None:
+        """Reset idle time of messages being processed, so they are not claimed as stale."""
+
+        await self._redis.xclaim(
+            self._stream,
+            self._group,
+            consumer,
+            min_idle_time=0,
+            message_ids=message_ids,
+            justid=True,
+        )
+
+    async def ack(self, message_id: str) -> None:
+        """Acknowledge and delete processed message."""
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            await pipe.xack(self._stream, self._group, message_id)
+            await pipe.xdel(self._stream, message_id)
+            await pipe.execute()
+
+    async def schedule_retry(self, fields: Dict[str, Any], attempt: int, delay: float) -> None:
+        """Schedule message to be re-added to stream after delay."""
+
+        entry = json.dumps({**fields, "attempt": attempt})
+        await self._redis.zadd(self._delayed, {entry: time() + delay})
+
+    async def promote_delayed(self) -> None:
+        """Move due delayed messages back to stream."""
+
+        due = await self._redis.zrangebyscore(self._delayed, 0, time())
+
+        for entry in due:
+            # ZREM result guards against double promotion by concurrent workers
+            if await self._redis.zrem(self._delayed, entry):
+                await self._redis.xadd(self._stream, json.loads(entry))
+
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    return JobQueue(get_redis(), get_redis_batcher())
+
+
+class JobWorker:
+    """
+    Worker consuming jobs from stream with bounded concurrency.
+
+    Args:
+        queue: Job queue
+        consumer: Unique consumer name within group
+        concurrency: Max jobs processed at the same time
+    """
+
+    def __init__(self, queue: JobQueue, consumer: str, concurrency: int):
+        self._queue = queue
+        self._consumer = consumer
+        self._concurrency = concurrency
+        self._stopping = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        self._in_flight: set[str] = set()
+
+    def stop(self) -> None:
+        """Request graceful stop (in-flight jobs are finished)."""
+
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Consume jobs until stopped."""
+
+        await self._queue.ensure_group()
+        logger.info("Job worker %s started (concurrency=%s)", self._consumer, self._concurrency)
+
+        heartbeat = asyncio.create_task(self._heartbeat())
+        backoff = 0.0
+
+        try:
+            while not self._stopping.is_set():
+                free = self._concurrency - len(self._tasks)
+                if free <= 0:
+                    await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                try:
+                    await self._queue.promote_delayed()
+
+                    messages = await self._queue.claim_stale(self._consumer, free)
+                    if len(messages) < free:
+                        messages += await self._queue.read(self._consumer, free - len(messages), block_ms=1000)
+
+                except (RedisError, OSError) as e:
+                    # Keep running jobs alive and poll again once Redis is back
+                    backoff = min(backoff * 2 or POLL_BACKOFF_MIN, POLL_BACKOFF_MAX)
+                    logger.warning("Job worker %s poll failed: %s, retrying in %ss", self._consumer, e, backoff)
+
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=backoff)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                backoff = 0.0
+
+                for message_id, fields in messages:
+                    self._in_flight.add(message_id)
+                    task = asyncio.create_task(self._process(message_id, fields))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+        finally:
+            if self._tasks:
+                await asyncio.wait(self._tasks)
+
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+
+        logger.info("Job worker %s stopped", self._consumer)
+
+    async def _heartbeat(self) -> None:
+        # Jobs may run longer than claim idle time: keep their messages fresh
+        interval = settings.jobs_claim_idle_ms / 1000 / 3
+
+        while True:
+            await asyncio.sleep(interval)
+            if self._in_flight:
+                try:
+                    await self._queue.touch(self._consumer, list(self._in_flight))
+                except Exception as e:
+                    logger.warning("Job heartbeat failed: %s", e)
+
+    async def _process(self, message_id: str, fields: Dict[str, Any]) -> None:
+        try:
+            await self._handle(message_id, fields)
+        finally:
+            self._in_flight.discard(message_id)
+
+    async def _handle(self, message_id: str, fields: Dict[str, Any]) -> None:
+        job_id = fields["job_id"]
+        name = fields["name"]
+        attempt = int(fields.get("attempt", 0))
+
+        # Each job runs in own task context, so its logs are correlated by job ID
+        request_id_var.set(job_id)
+
+        handler = registry.get_job(name)
+
+        if handler is None:
+            logger.error("Unknown job '%s' (%s)", name, job_id)
+            await self._queue.update(job_id, status="failed", error=f"Unknown job '{name}'")
+            await self._queue.ack(message_id)
+            return
+
+        await self._queue.update(job_id, status="running", attempts=attempt + 1)
+
+        try:
+            result = handler(JobContext(self._queue, job_id, attempt), **json.loads(fields["payload"]))
+            if inspect.isawaitable(result):
+                result = await result
+
+        except Exception as e:
+            if attempt < settings.jobs_max_retries:
+                delay = min(settings.jobs_retry_backoff_base * 2 ** attempt, settings.jobs_retry_backoff_max)
+                logger.warning("Job '%s' (%s) failed: %s, retrying in %ss", name, job_id, e, delay)
+                await self._queue.schedule_retry(fields, attempt + 1, delay)
+                await self._queue.update(job_id, status="retrying", error=str(e))
+            else:
+                logger.error("Job '%s' (%s) failed: %s", name, job_id, e, exc_info=True)
+                await self._queue.update(job_id, status="failed", error=str(e))
+
+        else:
+            await self._queue.update(
+                job_id,
+                status="succeeded",
+                progress=100,
+                result=json.dumps(result, default=str),
+            )
+            logger.info("Job '%s' (%s) succeeded", name, job_id)
+
+        await self._queue.ack(message_id)
+
+
+async def run_worker() -> None:
+    """Worker process entry point: load updates and consume jobs until SIGINT/SIGTERM."""
+
+    redis = get_redis()
+    await redis.ping()
+
+    init_database()
+    initialize_updates(get_session_factory())
+
+    worker = JobWorker(
+        get_job_queue(),
+        consumer=f"{socket.gethostname()}-{os.getpid()}",
+        concurrency=settings.jobs_concurrency,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    await start_offload()
+
+    try:
+        await worker.run()
+    finally:
+        await stop_offload()
+        await redis.aclose()
@@ -4,10 +4,21 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from .updates_engine import initialize_updates
-from .database import init_database, get_session_factory
+from .diagnostics import start_loop_monitor, stop_loop_monitor
+from .database import init_database, get_session_factory, get_shard_router, count_unsharded_rows
+from .group_commit import start_group_commit, stop_group_commit
+from .offload import start_offload, stop_offload
 from .hooks import registry
+from .jobs import get_job_status_prefix
 
-from app.common.redis_api import get_redis
+from app.config import settings
+from app.common.tracing import start_tracing, stop_tracing
+from app.common.redis_api import (
+    get_redis,
+    prewarm_redis_pool,
+    start_redis_cache,
+    stop_redis_cache,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -17,19 +28,61 @@ logger = logging.getLogger(__name__)
 async def lifespan(application: FastAPI):
     """Application lifespan handler."""
 
+    if settings.tracing_enabled:
+        await start_tracing()
+        logger.info("Tracing started with %s exporter", settings.tracing_exporter)
+
+    await start_loop_monitor()
+
     redis = get_redis()
     await redis.ping()
 
     logger.info("Redis connected")
 
+    if settings.redis_pool_prewarm > 0:
+        await prewarm_redis_pool(redis, settings.redis_pool_prewarm)
+        logger.info("Redis pool pre-warmed with %s connections", settings.redis_pool_prewarm)
+
+    if settings.redis_client_cache_enabled:
+        # Job status hashes are always cached: they are polled and rarely change
+        await start_redis_cache([get_job_status_prefix(), *settings.redis_client_cache_prefixes])
+
     init_database()
     session_factory = get_session_factory()
     initialize_updates(session_factory)
 
     for prefix, router in registry.routers.items():
         application.include_router(router)
-        logger.debug(f"Included router from update: {prefix}")
+        logger.debug("Included router from update: %s", prefix)
+
+    await start_offload()
+
+    shard_router = get_shard_router()
+    if shard_router is not None:
+        for name, model in registry.models.items():
+            # Rows left in default database would be silently hidden by sharding
+            left = await count_unsharded_rows(model)
+            if left:
+                raise RuntimeError(
+                    f"Default database has {left} rows of {model.__tablename__} while sharding is enabled, "
+                    f"move them into shards with: python -m app rebalance --model {name}"
+                )
+            await shard_router.sync_sequence(model)
+
+    if settings.group_commit_enabled:
+        if shard_router is None:
+            await start_group_commit(session_factory)
+            logger.info("Group commit writer started")
+        else:
+            logger.warning("Group commit is not supported with sharding, not started")
 
     yield
 
+    await stop_group_commit()
+    await stop_offload()
+    if shard_router is not None:
+        await shard_router.dispose()
+    await stop_redis_cache()
     await redis.aclose()
+    await stop_tracing()
+    await stop_loop_monitor()
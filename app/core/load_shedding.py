@@ -0,0 +1,229 @@
+"""
+Server-wide adaptive concurrency limiting and load shedding.
+
+Limit of concurrently processed requests adapts to observed latency (AIMD):
+it grows additively while latency stays under target and shrinks
+multiplicatively when latency exceeds target or requests fail.
+Requests over limit are rejected early with 503 and Retry-After.
+
+Each route belongs to priority class. Lower classes may only use part
+of current limit, so under overload bulk requests are shed first.
+Critical (admin) requests may use whole limit and additionally
+have fixed reserve of slots, so they get through even when limit
+has shrunk and is fully used.
+"""
+
+import json
+import logging
+
+from time import monotonic
+from typing import Any, Callable, Dict
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Share of current limit available to each priority class
+PRIORITY_SHARES = {
+    "critical": 1.0,
+    "normal": 0.9,
+    "bulk": 0.5,
+}
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter.
+
+    Args:
+        initial_limit: Starting limit
+        min_limit: Lower bound of limit
+        max_limit: Upper bound of limit
+        latency_target_ms: Latency above which limit is decreased
+        backoff: Multiplicative decrease factor
+        critical_reserve: Slots always available to critical requests
+    """
+
+    def __init__(
+            self,
+            initial_limit: int = 64,
+            min_limit: int = 4,
+            max_limit: int = 512,
+            latency_target_ms: float = 250.0,
+            backoff: float = 0.9,
+            critical_reserve: int = 4,
+    ):
+        self.limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_target = latency_target_ms / 1000
+        self._backoff = backoff
+        self._critical_reserve = critical_reserve
+        self._last_decrease = 0.0
+
+        self.in_flight = 0
+        self.critical_in_flight = 0
+        self.accepted = 0
+        self.rejected: Dict[str, int] = {name: 0 for name in PRIORITY_SHARES}
+
+    def try_acquire(self, priority: str) -> bool:
+        """Take slot for request of given priority class (False if request must be shed)."""
+
+        allowed = max(1, int(self.limit * PRIORITY_SHARES[priority]))
+
+        if priority == "critical":
+            admitted = self.in_flight < allowed or self.critical_in_flight < self._critical_reserve
+        else:
+            admitted = self.in_flight < allowed
+
+        if not admitted:
+            self.rejected[priority] += 1
+            return False
+
+        self.in_flight += 1
+        if priority == "critical":
+            self.critical_in_flight += 1
+        self.accepted += 1
+        return True
+
+    def release(self, priority: str, latency: float | None, failed: bool = False) -> None:
+        """
+        Release slot and adapt limit.
+
+        Args:
+            priority: Priority class slot was acquired for
+            latency: Request latency in seconds (None to skip latency sample)
+            failed: Whether request failed with server error (always decreases limit)
+        """
+
+        self.in_flight -= 1
+        if priority == "critical":
+            self.critical_in_flight -= 1
+
+        if failed or (latency is not None and latency > self._latency_target):
+            now = monotonic()
+            # Decrease at most once per target latency window, so one burst of slow responses counts once
+            if now - self._last_decrease >= self._latency_target:
+                self.limit = max(self._min_limit, self.limit * self._backoff)
+                self._last_decrease = now
+        elif latency is not None and self.in_flight + 1 >= self.limit / 2:
+            # Grow only when limit is actually used, otherwise it would grow unbounded
+            self.limit = min(self._max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get limiter state."""
+
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "critical_in_flight": self.critical_in_flight,
+            "accepted": self.accepted,
+            "rejected": dict(self.rejected),
+        }
+
+
+concurrency_limiter: AdaptiveConcurrencyLimiter | None = None
+
+
+def init_concurrency_limiter() -> AdaptiveConcurrencyLimiter:
+    """Create global concurrency limiter from settings."""
+
+    global concurrency_limiter
+
+    concurrency_limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=settings.load_shedding_initial_limit,
+        min_limit=settings.load_shedding_min_limit,
+        max_limit=settings.load_shedding_max_limit,
+        latency_target_ms=settings.load_shedding_latency_target_ms,
+        backoff=settings.load_shedding_backoff,
+        critical_reserve=settings.load_shedding_critical_reserve,
+    )
+
+    return concurrency_limiter
+
+
+def get_concurrency_limiter() -> AdaptiveConcurrencyLimiter | None:
+    """Get global concurrency limiter (None if load shedding is disabled)."""
+
+    return concurrency_limiter
+
+
+def get_route_priority(method: str, path: str) -> str:
+    """
+    Get priority class of request by longest matching pattern.
+
+    Pattern is "[METHOD ]path": path matches as prefix, or exactly when it
+    ends with "$" (e.g. "GET /api/v1/books$" does not match /api/v1/books/1).
+    """
+
+    priority = "normal"
+    matched = -1
+
+    for pattern, name in settings.load_shedding_priorities.items():
+        if name not in PRIORITY_SHARES or len(pattern) <= matched:
+            continue
+
+        pattern_method, _, pattern_path = pattern.rpartition(" ")
+        if pattern_method and pattern_method != method:
+            continue
+
+        if pattern_path.endswith("$"):
+            matches = path == pattern_path[:-1]
+        else:
+            matches = path.startswith(pattern_path)
+
+        if matches:
+            priority = name
+            matched = len(pattern)
+
+    return priority
+
+
+class LoadSheddingMiddleware:
+    """ASGI middleware rejecting requests over adaptive concurrency limit."""
+
+    def __init__(self, app: Any, limiter: AdaptiveConcurrencyLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def _reject(self, send: Callable) -> None:
+        body = json.dumps({"detail": "Server is overloaded. Please try again later"}).encode()
+
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.load_shedding_retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = get_route_priority(scope["method"], scope["path"])
+
+        if not self.limiter.try_acquire(priority):
+            await self._reject(send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = monotonic()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Long-running bulk responses (exports) are not a latency signal, but their failures are
+            latency = monotonic() - start if priority != "bulk" else None
+            self.limiter.release(priority, latency, failed=status >= 500)
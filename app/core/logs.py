@@ -0,0 +1,192 @@
+"""
+Asynchronous structured logging.
+
+Log calls on request path only put record into in-memory queue. Background
+listener thread formats records (JSON lines or plain text) and writes them
+to stderr, so slow output never blocks event loop.
+
+Each record gets request_id of current request (set by RequestIdMiddleware
+from X-Request-ID header or generated), so all logs of one request can be
+correlated. DEBUG records can be sampled with log_debug_sample_rate.
+
+Example (settings):
+    LOG_LEVEL="INFO"
+    LOG_LEVELS='{"app.core.hooks": "DEBUG", "sqlalchemy.engine": "WARNING"}'
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict
+
+from app.config import settings
+
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+# Standard LogRecord attributes (and uvicorn's ANSI-colored message copy),
+# everything else passed with extra= goes to JSON output
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "color_message"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds request_id of current context to record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Passes only given share of DEBUG records (higher levels always pass)."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats record as single-line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        if getattr(record, "request_id", None):
+            data["request_id"] = record.request_id
+
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                data[key] = value
+
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+
+        return json.dumps(data, default=str)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Queue handler leaving formatting to listener thread.
+
+    Records stay in the same process, so unlike base QueueHandler they are
+    queued as is instead of being formatted for pickling. When queue is
+    full records are dropped and counted instead of blocking.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+handler: AsyncQueueHandler | None = None
+listener: QueueListener | None = None
+
+
+def setup_logging() -> None:
+    """Configure root logger with queue handler and start listener thread (idempotent)."""
+
+    global handler, listener
+
+    if listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stderr)
+    if settings.log_format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+        ))
+
+    handler = AsyncQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    handler.addFilter(RequestIdFilter())
+    if settings.log_debug_sample_rate < 1:
+        handler.addFilter(DebugSamplingFilter(settings.log_debug_sample_rate))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.log_level)
+
+    for name, level in settings.log_levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    listener = QueueListener(handler.queue, output)
+    listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Write queued records and stop listener thread."""
+
+    global listener
+
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+def get_log_handler() -> AsyncQueueHandler | None:
+    """Get root queue handler (None if logging is not set up)."""
+
+    return handler
+
+
+class RequestIdMiddleware:
+    """ASGI middleware binding request ID to context and returning it in X-Request-ID header."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for key, value in scope["headers"]:
+            if key == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+
+        if request_id is None or not _REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
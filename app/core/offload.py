@@ -0,0 +1,250 @@
+"""
+Offloading of CPU-bound services to managed process/thread pools.
+
+Services marked with cpu_bound() at registration are run in process pool
+(or thread pool for code releasing GIL) instead of event loop. Callers
+keep the same interface: await registry.get_service(name)(*args).
+
+Process pool services must be module-level functions with picklable
+arguments and results (no sessions or ORM objects).
+
+Example:
+    @hookimpl
+    def register_services(self, session_factory):
+        return {
+            "validate_import": (1, cpu_bound(validate_import)),
+            "render_report": (1, cpu_bound(render_report, executor="thread", timeout=10)),
+        }
+"""
+
+import asyncio
+import importlib
+import inspect
+import logging
+import multiprocessing
+import os
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ("process", "thread")
+
+# Modules of process pool services, imported by workers at start
+process_service_modules: set[str] = set()
+
+
+class OffloadQueueFullError(RuntimeError):
+    """Raised when too many offloaded calls are pending."""
+
+
+class OffloadTimeoutError(TimeoutError):
+    """Raised when offloaded call does not finish in time."""
+
+
+def cpu_bound(func: Callable, executor: str = "process", timeout: float | None = None) -> Callable:
+    """
+    Mark service as CPU-bound.
+
+    Args:
+        func: Sync service function
+        executor: "process" (default) or "thread" (for code releasing GIL)
+        timeout: Per-call timeout in seconds (defaults to settings.offload_timeout)
+
+    Raises:
+        TypeError: If func is coroutine function (it would return un-awaited coroutine from pool)
+    """
+
+    if inspect.iscoroutinefunction(func):
+        raise TypeError(f"{func.__name__} is coroutine function, only sync functions can be offloaded")
+
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor}")
+
+    func.__offload__ = {"executor": executor, "timeout": timeout}
+    return func
+
+
+def _init_process_worker(modules: tuple[str, ...]) -> None:
+    for name in modules:
+        importlib.import_module(name)
+
+
+class OffloadExecutor:
+    """
+    Process and thread pools with bounded pending calls and per-call timeouts.
+
+    Args:
+        process_workers: Process pool size
+        thread_workers: Thread pool size
+        max_pending: Max calls queued or running in pools
+        timeout: Default per-call timeout in seconds
+        mp_context: Multiprocessing start method
+    """
+
+    def __init__(
+            self,
+            process_workers: int = 2,
+            thread_workers: int = 4,
+            max_pending: int = 100,
+            timeout: float = 30.0,
+            mp_context: str = "spawn",
+    ):
+        self._process_workers = process_workers
+        self._thread_workers = thread_workers
+        self._max_pending = max_pending
+        self._timeout = timeout
+        self._mp_context = mp_context
+
+        self._pools: Dict[str, Executor] = {}
+        self.pending = 0
+
+    async def start(self, preload: Iterable[str] = ()) -> None:
+        """
+        Create pools and start all process workers.
+
+        Args:
+            preload: Modules imported by each process worker at start (modules of
+                process pool services), so first calls do not pay for imports
+        """
+
+        modules = tuple(sorted(preload))
+
+        self._pools = {
+            "process": ProcessPoolExecutor(
+                max_workers=self._process_workers,
+                mp_context=multiprocessing.get_context(self._mp_context),
+                # Without services to preload workers only import main module
+                initializer=_init_process_worker if modules else None,
+                initargs=(modules,) if modules else (),
+            ),
+            "thread": ThreadPoolExecutor(
+                max_workers=self._thread_workers,
+                thread_name_prefix="offload",
+            ),
+        }
+
+        # Spawned workers are started lazily on submit: start all of them now
+        # (one process per submit), so their startup does not count against
+        # timeouts of first calls
+        await asyncio.gather(*(
+            asyncio.wrap_future(self._pools["process"].submit(os.getpid))
+            for _ in range(self._process_workers)
+        ))
+
+    async def shutdown(self) -> None:
+        """Cancel queued calls and wait for running ones."""
+
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, executor: str, func: Callable, *args: Any, timeout: float | None = None, **kwargs: Any) -> Any:
+        """
+        Run func(*args, **kwargs) in pool.
+
+        Pending slot is held until call actually finishes in pool, so calls
+        still running after timeout keep counting against max pending.
+
+        Raises:
+            OffloadQueueFullError: If max pending calls is reached
+            OffloadTimeoutError: If call does not finish in time (queued call is dropped,
+                running call is not interrupted)
+        """
+
+        if not self._pools:
+            raise RuntimeError("Offload executor is not running")
+
+        if self.pending >= self._max_pending:
+            raise OffloadQueueFullError("Too many pending offloaded calls")
+
+        loop = asyncio.get_running_loop()
+        future = self._pools[executor].submit(func, *args, **kwargs)
+
+        def on_done(_) -> None:
+            # Called from pool thread
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._release)
+
+        self.pending += 1
+        future.add_done_callback(on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout or self._timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise OffloadTimeoutError(f"{func.__name__} did not finish in time")
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def _release(self) -> None:
+        self.pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get executor state."""
+
+        return {
+            "running": bool(self._pools),
+            "pending": self.pending,
+            "max_pending": self._max_pending,
+        }
+
+
+offload_executor: OffloadExecutor | None = None
+
+
+async def start_offload() -> OffloadExecutor:
+    """Create and start global offload executor (process workers preload service modules)."""
+
+    global offload_executor
+
+    offload_executor = OffloadExecutor(
+        process_workers=settings.offload_process_workers,
+        thread_workers=settings.offload_thread_workers,
+        max_pending=settings.offload_max_pending,
+        timeout=settings.offload_timeout,
+        mp_context=settings.offload_mp_context,
+    )
+    await offload_executor.start(process_service_modules)
+
+    return offload_executor
+
+
+async def stop_offload() -> None:
+    """Stop global offload executor."""
+
+    global offload_executor
+
+    if offload_executor is not None:
+        await offload_executor.shutdown()
+        offload_executor = None
+
+
+def get_offload_executor() -> OffloadExecutor | None:
+    """Get global offload executor (None if not started)."""
+
+    return offload_executor
+
+
+def offloaded(func: Callable) -> Callable:
+    """Wrap service marked with cpu_bound() into async function running it in pool."""
+
+    options = func.__offload__
+
+    if options["executor"] == "process":
+        process_service_modules.add(func.__module__)
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        if offload_executor is None:
+            raise RuntimeError("Offload executor is not running")
+
+        return await offload_executor.run(options["executor"], func, *args, timeout=options["timeout"], **kwargs)
+
+    return wrapper
@@ -6,17 +6,53 @@ Each module should have an UpdatePlugin class implementing hooks.
 """
 
 import importlib
+import inspect
 import logging
 import pluggy
 
 from pathlib import Path
+from typing import Any, Iterator
+
+from app.config import settings
+from app.common.profiling import profiled
+from app.common.tracing import traced
 
 from .hooks import AppHookSpec, merge_with_priority, registry
+from .offload import offloaded
 
 
 logger = logging.getLogger(__name__)
 
 
+def _call_hook(pm: pluggy.PluginManager, name: str, **kwargs: Any) -> Iterator[tuple[str | None, Any]]:
+    """
+    Call hook through pluggy and pair each result with update that returned it.
+
+    Pluggy calls implementations in reverse registration order and collects
+    non-None results, so results match non-wrapper implementations in that
+    order. When they can not be matched (some implementation returned None
+    or wrapper changed results), update is None.
+
+    Yields (update name, result) for non-empty results.
+    """
+
+    hook = getattr(pm.hook, name)
+    results = hook(**kwargs)
+
+    updates: list[str | None] = [
+        impl.plugin_name
+        for impl in reversed(hook.get_hookimpls())
+        if not impl.wrapper and not impl.hookwrapper
+    ]
+    if len(updates) != len(results):
+        logger.debug("Results of %s can not be attributed to updates", name)
+        updates = [None] * len(results)
+
+    for update, result in zip(updates, results):
+        if result:
+            yield update, result
+
+
 def initialize_updates(session_factory) -> pluggy.PluginManager:
     """
     Initialize updates system by loading all update plugins.
@@ -35,10 +71,10 @@ def initialize_updates(session_factory) -> pluggy.PluginManager:
     pm.add_hookspecs(AppHookSpec)
 
     updates_dir = Path(__file__).parent.parent / "updates"
-    logger.info(f"Scanning for updates in: {updates_dir}")
+    logger.info("Scanning for updates in: %s", updates_dir)
 
     if not updates_dir.exists():
-        logger.warning(f"Updates directory not found: {updates_dir}")
+        logger.warning("Updates directory not found: %s", updates_dir)
         return pm
 
     for path in sorted(updates_dir.iterdir()):
@@ -50,56 +86,101 @@ def initialize_updates(session_factory) -> pluggy.PluginManager:
                     plugin_class = getattr(module, "UpdatePlugin")
                     plugin_instance = plugin_class()
                     pm.register(plugin_instance, name=path.name)
-                    logger.info(f"Registered update plugin: {path.name}")
+                    logger.info("Registered update plugin: %s", path.name)
                 else:
-                    logger.debug(f"No UpdatePlugin in {path.name}, skipping")
+                    logger.debug("No UpdatePlugin in %s, skipping", path.name)
 
             except Exception as e:
-                logger.error(f"Failed to load update {path.name}: {e}", exc_info=True)
+                logger.error("Failed to load update %s: %s", path.name, e, exc_info=True)
 
     model_priorities: dict[str, int] = {}
     schema_priorities: dict[str, int] = {}
     service_priorities: dict[str, int] = {}
     router_priorities: dict[str, int] = {}
-
-    for result in pm.hook.register_models():
-        if result:
-            merge_with_priority(
-                registry._models,
-                result,
-                model_priorities,
-                "Model"
-            )
-    logger.info(f"Registered {len(registry._models)} models")
-
-    for result in pm.hook.register_schemas():
-        if result:
-            merge_with_priority(
-                registry._schemas,
-                result,
-                schema_priorities,
-                "Schema"
-            )
-    logger.info(f"Registered {len(registry._schemas)} schemas")
-
-    for result in pm.hook.register_services(session_factory=session_factory):
-        if result:
-            merge_with_priority(
-                registry._services,
-                result,
-                service_priorities,
-                "Service"
-            )
-    logger.info(f"Registered {len(registry._services)} services")
-
-    for result in pm.hook.register_routers():
-        if result:
-            merge_with_priority(
-                registry._routers,
-                result,
-                router_priorities,
-                "Router"
-            )
-    logger.info(f"Registered {len(registry._routers)} routers")
+    job_priorities: dict[str, int] = {}
+    span_priorities: dict[str, int] = {}
+
+    for update, result in _call_hook(pm, "register_models"):
+        merge_with_priority(
+            registry._models,
+            result,
+            model_priorities,
+            "Model",
+            update,
+            registry._origins.setdefault("models", {}),
+        )
+    logger.info("Registered %s models", len(registry._models))
+
+    for update, result in _call_hook(pm, "register_schemas"):
+        merge_with_priority(
+            registry._schemas,
+            result,
+            schema_priorities,
+            "Schema",
+            update,
+            registry._origins.setdefault("schemas", {}),
+        )
+    logger.info("Registered %s schemas", len(registry._schemas))
+
+    for update, result in _call_hook(pm, "register_services", session_factory=session_factory):
+        merge_with_priority(
+            registry._services,
+            result,
+            service_priorities,
+            "Service",
+            update,
+            registry._origins.setdefault("services", {}),
+        )
+    logger.info("Registered %s services", len(registry._services))
+
+    for name, service in registry._services.items():
+        if hasattr(service, "__offload__"):
+            registry._services[name] = offloaded(service)
+            logger.debug("Service '%s' offloaded to %s pool", name, service.__offload__["executor"])
+
+    for update, result in _call_hook(pm, "register_profiling_spans"):
+        merge_with_priority(
+            registry._profiling_spans,
+            result,
+            span_priorities,
+            "Profiling span",
+            update,
+            registry._origins.setdefault("profiling_spans", {}),
+        )
+
+    # Spans are also listed in slow-request logs
+    if settings.profiling_enabled or settings.slow_request_ms > 0:
+        for name, span_name in registry._profiling_spans.items():
+            service = registry._services.get(name)
+            if inspect.iscoroutinefunction(service):
+                registry._services[name] = profiled(span_name, service)
+        logger.info("Registered %s profiling spans", len(registry._profiling_spans))
+
+    if settings.tracing_enabled:
+        for name, service in registry._services.items():
+            if inspect.iscoroutinefunction(service):
+                registry._services[name] = traced(f"service {name}", service)
+
+    for update, result in _call_hook(pm, "register_routers"):
+        merge_with_priority(
+            registry._routers,
+            result,
+            router_priorities,
+            "Router",
+            update,
+            registry._origins.setdefault("routers", {}),
+        )
+    logger.info("Registered %s routers", len(registry._routers))
+
+    for update, result in _call_hook(pm, "register_jobs"):
+        merge_with_priority(
+            registry._jobs,
+            result,
+            job_priorities,
+            "Job",
+            update,
+            registry._origins.setdefault("jobs", {}),
+        )
+    logger.info("Registered %s jobs", len(registry._jobs))
 
     return pm
@@ -31,21 +31,54 @@ class UpdatePlugin:
     def register_services(self, session_factory):
         """Register api_v1 service functions."""
 
-        from .services import get_all_books, create_book, get_book_by_id
+        from .services import (
+            get_all_books,
+            create_book,
+            get_book_by_id,
+            get_books_by_ids,
+            search_books,
+            make_book_loader,
+            export_books,
+        )
 
         return {
             "get_all_books": (1, get_all_books),
             "create_book": (1, create_book),
             "get_book_by_id": (1, get_book_by_id),
+            "get_books_by_ids": (1, get_books_by_ids),
+            "search_books": (1, search_books),
+            "book_loader": (1, make_book_loader(session_factory)),
+            "export_books": (1, export_books),
         }
 
     @hookimpl
     def register_routers(self):
         """Register api_v1 API routers."""
 
-        from .routers import books, admin
+        from .routers import books, admin, jobs
 
         return {
             "/books": (1, books.router),
             "/admin": (1, admin.router),
+            "/jobs": (1, jobs.router),
         }
+
+    @hookimpl
+    def register_profiling_spans(self):
+        """Register api_v1 service profiling spans."""
+
+        return {
+            "get_all_books": (1, "db.get_all_books"),
+            "get_book_by_id": (1, "db.get_book_by_id"),
+            "get_books_by_ids": (1, "db.get_books_by_ids"),
+            "search_books": (1, "db.search_books"),
+            "create_book": (1, "db.create_book"),
+        }
+
+    @hookimpl
+    def register_jobs(self):
+        """Register api_v1 background job handlers."""
+
+        from .jobs import setup_database_job
+
+        return {"setup_database": (1, setup_database_job)}
@@ -0,0 +1,18 @@
+"""
+Background job handlers for api_v1.
+"""
+
+from app.core.database import create_tables, drop_tables
+from app.core.jobs import JobContext
+
+
+async def setup_database_job(ctx: JobContext) -> dict:
+    """Drop and recreate all database tables."""
+
+    await ctx.set_progress(0, "Dropping tables")
+    await drop_tables()
+
+    await ctx.set_progress(50, "Creating tables")
+    await create_tables()
+
+    return {"msg": "Database has been setup successfully"}
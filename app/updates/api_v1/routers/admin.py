@@ -2,21 +2,48 @@
 Admin router for api_v1.
 """
 
+from typing import Annotated
 from fastapi import APIRouter, Depends
 
 from app.core.database import create_tables, drop_tables
+from app.core.diagnostics import collect_diagnostics
+from app.core.jobs import JobQueue, get_job_queue
 
-from app.common.rate_limiter import rate_limiter_high_lvl
+from app.common.dependencies import require_admin_token
+from app.common.rate_limiter import rate_limiter_high_lvl, rate_limiter_medium_lvl
 
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Administration"])
 
 
 @router.post("/setup_database", summary="Setup database", dependencies=[Depends(rate_limiter_high_lvl)])
-async def setup_database():
-    """Drop and recreate all database tables."""
+async def setup_database(
+        queue: Annotated[JobQueue, Depends(get_job_queue)],
+        background: bool = False,
+):
+    """Drop and recreate all database tables (as background job if background=true)."""
+
+    if background:
+        job_id = await queue.enqueue("setup_database")
+
+        return {"success": True, "msg": "Database setup has been queued", "job_id": job_id}
 
     await drop_tables()
     await create_tables()
 
     return {"success": True, "msg": "Database has been setup successfully"}
+
+
+@router.get(
+    "/diagnostics",
+    summary="Runtime diagnostics",
+    dependencies=[Depends(rate_limiter_medium_lvl), Depends(require_admin_token)],
+)
+async def diagnostics():
+    """
+    Snapshot of database and Redis pools, event-loop lag, tasks, GC and memory,
+    rate limiter keys, caches, limiters and resolved plugin registry
+    (requires X-Admin-Token header).
+    """
+
+    return await collect_diagnostics()
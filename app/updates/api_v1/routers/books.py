@@ -2,24 +2,43 @@
 Books router for api_v1.
 """
 
+from typing import Literal
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 
-from app.core.database import SessionDep
+from app.config import settings
+from app.core.database import SessionDep, ShardSessionDep, get_session_factory
+from app.core.group_commit import WriteQueueFullError
 from app.core.hooks import registry
 
+from app.common.export import EXPORT_FORMATS, is_format_available
 from app.common.rate_limiter import (
     rate_limiter_low_lvl,
-    rate_limiter_medium_lvl # ,
-    # rate_limiter_high_lvl
+    rate_limiter_medium_lvl,
+    rate_limiter_high_lvl
 )
 
 
 router = APIRouter(prefix="/api/v1/books", tags=["Books API"])
 
 
+def parse_ids(ids: str) -> list[int]:
+    """Parse comma-separated list of IDs (duplicates removed, order kept)."""
+
+    try:
+        book_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+
+    if len(book_ids) > settings.batch_loader_max_ids:
+        raise HTTPException(status_code=422, detail=f"At most {settings.batch_loader_max_ids} ids are allowed")
+
+    return book_ids
+
+
 @router.get("", summary="Get all books", dependencies=[Depends(rate_limiter_low_lvl)])
 async def get_books(session: SessionDep):
-    """Get all books."""
+    """Get all books (placement key header does not scope reads)."""
 
     get_all_books = registry.get_service("get_all_books")
     books = await get_all_books(session)
@@ -27,12 +46,59 @@ async def get_books(session: SessionDep):
     return books
 
 
+@router.get("/batch", summary="Get books by IDs", dependencies=[Depends(rate_limiter_low_lvl)])
+async def get_books_batch(ids: str):
+    """Get books with given IDs (?ids=1,2,3), batched with concurrent by-ID lookups."""
+
+    book_loader = registry.get_service("book_loader")
+    books = await book_loader.load_many(parse_ids(ids))
+
+    return [book for book in books if book is not None]
+
+
+@router.get("/search", summary="Search books", dependencies=[Depends(rate_limiter_low_lvl)])
+async def search_books(session: SessionDep, q: str):
+    """Search books by title or author."""
+
+    search_books_func = registry.get_service("search_books")
+    books = await search_books_func(session, q)
+
+    return books
+
+
+@router.get("/export", summary="Export all books", dependencies=[Depends(rate_limiter_high_lvl)])
+async def export_books(format: Literal["csv", "ndjson", "parquet"] = "csv", gzip: bool = False):
+    """Stream export of all books in CSV, NDJSON or Parquet format."""
+
+    if not is_format_available(format):
+        raise HTTPException(status_code=400, detail="Parquet export is not available (pyarrow is not installed)")
+
+    export_books_func = registry.get_service("export_books")
+
+    async def stream():
+        # Own session: response body is streamed after request dependencies are closed
+        async with get_session_factory()() as session:
+            async for data in export_books_func(session, format, gzip):
+                yield data
+
+    filename = f"books.{format}" + (".gz" if gzip else "")
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{book_id}", summary="Get book by ID", dependencies=[Depends(rate_limiter_low_lvl)])
-async def get_book(book_id: int, session: SessionDep):
+async def get_book(book_id: int):
     """Get book by ID."""
 
     get_book_by_id = registry.get_service("get_book_by_id")
-    book = await get_book_by_id(session, book_id)
+
+    # Own session without connection: lookup waits for batch, which needs connection too
+    async with get_session_factory()() as session:
+        book = await get_book_by_id(session, book_id)
 
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
@@ -41,13 +107,21 @@ async def get_book(book_id: int, session: SessionDep):
 
 
 @router.post("", summary="Create book", dependencies=[Depends(rate_limiter_medium_lvl)])
-async def create_book(session: SessionDep, title: str, author: str):
+async def create_book(session: ShardSessionDep, title: str, author: str):
     """Create a new book."""
 
     book_add_schema = registry.get_schema("BookAddSchema")
     data = book_add_schema(title=title, author=author)
 
     create_book_func = registry.get_service("create_book")
-    book = await create_book_func(session, data.title, data.author)
+
+    try:
+        book = await create_book_func(session, data.title, data.author)
+    except WriteQueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Write queue is full. Please try again later",
+            headers={"Retry-After": "1"},
+        )
 
     return {"success": True, "book_id": book.id}
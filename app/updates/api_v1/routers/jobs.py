@@ -0,0 +1,25 @@
+"""
+Jobs router for api_v1.
+"""
+
+from typing import Annotated
+from fastapi import APIRouter, HTTPException, Depends
+
+from app.core.jobs import JobQueue, get_job_queue
+
+from app.common.rate_limiter import rate_limiter_low_lvl
+
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", summary="Get job status", dependencies=[Depends(rate_limiter_low_lvl)])
+async def get_job_status(job_id: str, queue: Annotated[JobQueue, Depends(get_job_queue)]):
+    """Get background job status, progress and result."""
+
+    status = await queue.get_status(job_id)
+
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return status
@@ -2,30 +2,193 @@
 Service functions for api_v1.
 """
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+
+from typing import AsyncIterator
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.database import get_shard_router, get_session_shard
+from app.core.group_commit import get_group_commit_writer
+from app.core.hooks import registry
+from app.common.batch_loader import BatchLoader
+from app.common.export import encode_rows, gzip_stream
 
 from .models import BookModel
 
 
+BOOK_EXPORT_COLUMNS = ("id", "title", "author")
+
+# Sharded inserts retried after ID collision (Redis sequence reset)
+SHARDED_INSERT_ATTEMPTS = 3
+
+
 async def get_all_books(session: AsyncSession) -> list[BookModel]:
-    """Get all books from database."""
-    query = select(BookModel)
+    """Get all books from database (from all shards unless session is bound to shard)."""
+    router = get_shard_router()
+    if router is not None and get_session_shard(session) is None:
+        return await router.gather(get_all_books, key=lambda book: book.id)
+
+    query = select(BookModel).order_by(BookModel.id)
+    result = await session.execute(query)
+    return list(result.scalars().all())
+
+
+async def search_books(session: AsyncSession, text: str) -> list[BookModel]:
+    """Search books by title or author (on all shards unless session is bound to shard)."""
+    router = get_shard_router()
+    if router is not None and get_session_shard(session) is None:
+        return await router.gather(lambda shard_session: search_books(shard_session, text), key=lambda book: book.id)
+
+    pattern = f"%{text}%"
+    query = (
+        select(BookModel)
+        .where(or_(BookModel.title.ilike(pattern), BookModel.author.ilike(pattern)))
+        .order_by(BookModel.id)
+    )
     result = await session.execute(query)
     return list(result.scalars().all())
 
 
 async def get_book_by_id(session: AsyncSession, book_id: int) -> BookModel | None:
-    """Get book by ID."""
+    """
+    Get book by ID (from shard owning ID when sharding is enabled).
+
+    Unless session holds pending changes (which lookup must see), it goes
+    through book_loader and is batched with concurrent lookups into one
+    get_books_by_ids query.
+    """
+    if not (session.new or session.dirty or session.deleted):
+        book_loader = registry.get_service("book_loader")
+        return await book_loader.load(book_id)
+
+    router = get_shard_router()
+    if router is not None and get_session_shard(session) is None:
+        return await router.run(router.shard_for_key(book_id), lambda shard_session: get_book_by_id(shard_session, book_id))
+
     query = select(BookModel).where(BookModel.id == book_id)
     result = await session.execute(query)
     return result.scalar_one_or_none()
 
 
+async def get_books_by_ids(session: AsyncSession, book_ids: list[int]) -> list[BookModel]:
+    """Get books by list of IDs in one query."""
+    query = select(BookModel).where(BookModel.id.in_(book_ids))
+    result = await session.execute(query)
+    return list(result.scalars().all())
+
+
+def make_book_loader(session_factory: async_sessionmaker[AsyncSession]) -> BatchLoader[int, BookModel]:
+    """
+    Create batch loader coalescing concurrent by-ID lookups into one query.
+
+    Batches are resolved with get_books_by_ids service from registry,
+    so updates overriding it are used by loader too.
+    """
+
+    async def batch_load(book_ids: list[int]) -> dict[int, BookModel]:
+        get_books_by_ids = registry.get_service("get_books_by_ids")
+        router = get_shard_router()
+
+        if router is None:
+            async with session_factory() as session:
+                books = await get_books_by_ids(session, book_ids)
+            return {book.id: book for book in books}
+
+        ids_by_shard: dict[str, list[int]] = {}
+        for book_id in book_ids:
+            ids_by_shard.setdefault(router.shard_for_key(book_id), []).append(book_id)
+
+        results = await asyncio.gather(*(
+            router.run(shard, lambda session, ids=ids: get_books_by_ids(session, ids))
+            for shard, ids in ids_by_shard.items()
+        ))
+        return {book.id: book for books in results for book in books}
+
+    return BatchLoader(
+        batch_load,
+        max_batch_size=settings.batch_loader_max_size,
+        window_ms=settings.batch_loader_window_ms,
+    )
+
+
 async def create_book(session: AsyncSession, title: str, author: str) -> BookModel:
-    """Create a new book."""
+    """
+    Create a new book.
+
+    With sharding, book is placed into session shard (placement key) or spread evenly.
+    Otherwise it goes through group commit writer when it is enabled.
+    """
+    router = get_shard_router()
+    if router is not None:
+        session_shard = get_session_shard(session)
+
+        for attempt in range(SHARDED_INSERT_ATTEMPTS):
+            book_id, shard = await router.allocate_id(BookModel.__tablename__, session_shard)
+            book = BookModel(id=book_id, title=title, author=author)
+
+            try:
+                if session_shard is None:
+                    async with router.session(shard) as shard_session:
+                        shard_session.add(book)
+                        await shard_session.commit()
+                else:
+                    session.add(book)
+                    await session.commit()
+                return book
+
+            except IntegrityError:
+                if session_shard is not None:
+                    await session.rollback()
+                if attempt == SHARDED_INSERT_ATTEMPTS - 1:
+                    raise
+                # ID sequence lives in Redis and may have been reset: move it past existing IDs and retry
+                await router.sync_sequence(BookModel)
+
     book = BookModel(title=title, author=author)
+
+    writer = get_group_commit_writer()
+    if writer is not None:
+        return await writer.submit(book)
+
     session.add(book)
     await session.commit()
     await session.refresh(book)
     return book
+
+
+async def stream_books(session: AsyncSession, chunk_size: int) -> AsyncIterator[list[tuple]]:
+    """Stream all books as row chunks using server-side cursor."""
+    query = (
+        select(BookModel.id, BookModel.title, BookModel.author)
+        .order_by(BookModel.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(query)
+    async for partition in result.partitions(chunk_size):
+        yield [tuple(row) for row in partition]
+
+
+async def export_books(
+        session: AsyncSession,
+        fmt: str,
+        compress: bool = False,
+        chunk_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Export all books as encoded byte chunks (csv, ndjson or parquet, optionally gzipped)."""
+    chunk_size = chunk_size or settings.export_chunk_size
+
+    router = get_shard_router()
+    if router is not None and get_session_shard(session) is None:
+        chunks = router.stream(lambda shard_session: stream_books(shard_session, chunk_size))
+    else:
+        chunks = stream_books(session, chunk_size)
+
+    stream = encode_rows(chunks, BOOK_EXPORT_COLUMNS, fmt)
+    if compress:
+        stream = gzip_stream(stream)
+    async for data in stream:
+        yield data
@@ -9,6 +9,7 @@ from app.config import settings
 from app.core.templates import get_templates
 from app.core.hooks import registry
 from app.core.database import SessionDep
+from app.common.profiling import profiling_span
 
 
 router = APIRouter(tags=["Frontend"])
@@ -19,20 +20,22 @@ templates = get_templates()
 async def home(request: Request):
     """Render home page."""
 
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": request, "settings": settings}
-    )
+    with profiling_span("render.index"):
+        return templates.TemplateResponse(
+            "index.html",
+            {"request": request, "settings": settings}
+        )
 
 
 @router.get(path="/about", response_class=HTMLResponse, summary="About page")
 async def about(request: Request):
     """Render about page."""
 
-    return templates.TemplateResponse(
-        "about.html",
-        {"request": request, "settings": settings}
-    )
+    with profiling_span("render.about"):
+        return templates.TemplateResponse(
+            "about.html",
+            {"request": request, "settings": settings}
+        )
 
 
 @router.get(path="/books", response_class=HTMLResponse, summary="Books page")
@@ -46,11 +49,12 @@ async def books_page(request: Request, session: SessionDep):
     else:
         books = []
 
-    return templates.TemplateResponse(
-        "books.html",
-        {
-            "request": request,
-            "settings": settings,
-            "books": books
-        }
-    )
+    with profiling_span("render.books"):
+        return templates.TemplateResponse(
+            "books.html",
+            {
+                "request": request,
+                "settings": settings,
+                "books": books
+            }
+        )